@@ -31,6 +31,16 @@ from routes.web import web_bp
 
 # Import database models
 from models.database import db
+from models.parking import ParkingSpace
+from commands import register_commands
+from utils.geo_index import geo_index
+from utils.search_cache import search_cache
+from utils.occupancy import occupancy_index
+from utils.suggest import suggest_index
+from utils.search_snapshots import search_snapshots
+from utils.relevance import relevance_scorer
+from utils.image_variants import image_variants
+from utils.disk_cache import image_disk_cache
 
 def create_app(config_class=Config):
     """Application factory pattern"""
@@ -77,7 +87,55 @@ def create_app(config_class=Config):
     except Exception as e:
         print(f"⚠️  Database initialization warning: {e}")
     
-    print("✅ Images stored as base64 in MongoDB (no local files needed)")
+    search_cache.configure(
+        max_entries=app.config.get('SEARCH_CACHE_MAX_ENTRIES'),
+        ttl_seconds=app.config.get('SEARCH_CACHE_TTL_SECONDS')
+    )
+    relevance_scorer.configure(
+        weights=app.config.get('RELEVANCE_WEIGHTS'),
+        max_candidates=app.config.get('RELEVANCE_MAX_CANDIDATES'),
+        ttl_seconds=app.config.get('RELEVANCE_TTL_SECONDS')
+    )
+    image_variants.configure(max_workers=app.config.get('IMAGE_VARIANT_WORKERS'))
+    image_disk_cache.configure(
+        directory=app.config.get('IMAGE_CACHE_DIR'),
+        max_bytes=app.config.get('IMAGE_CACHE_MAX_BYTES')
+    )
+    
+    # City search only matches listings tokenized in the current format
+    try:
+        if db.db is not None:
+            updated = ParkingSpace.backfill_locality_tokens(db)
+            if updated:
+                print(f"✅ Backfilled locality tokens on {updated} parking spaces")
+    except Exception as e:
+        print(f"⚠️  Locality token backfill warning: {e}")
+    
+    # Warm in-memory search structures (searches fall back to MongoDB while cold)
+    try:
+        if db.db is not None:
+            geo_index.build(db)
+    except Exception as e:
+        print(f"⚠️  Geo index warmup warning: {e}")
+    try:
+        if db.db is not None:
+            occupancy_index.build(db)
+    except Exception as e:
+        print(f"⚠️  Occupancy index warmup warning: {e}")
+    try:
+        if db.db is not None:
+            suggest_index.build(db)
+    except Exception as e:
+        print(f"⚠️  Suggest index warmup warning: {e}")
+    
+    search_snapshots.configure(
+        top_k=app.config.get('SEARCH_SNAPSHOT_TOP_K'),
+        refresh_seconds=app.config.get('SEARCH_SNAPSHOT_REFRESH_SECONDS')
+    )
+    if db.db is not None:
+        search_snapshots.start(lambda filters: ParkingSpace.search_response(db, filters))
+    
+    print("✅ Images stored in the MongoDB image blob store (no local files needed)")
     
     # Register blueprints
     app.register_blueprint(web_bp)  # Web pages (no prefix)
@@ -91,6 +149,9 @@ def create_app(config_class=Config):
     app.register_blueprint(wallet_bp, url_prefix='/api/wallet')
     app.register_blueprint(review_bp, url_prefix='/api/review')
     
+    # Maintenance CLI commands
+    register_commands(app)
+    
     # Health check endpoint
     @app.route('/health')
     def health_check():
@@ -0,0 +1,103 @@
+"""
+Search Post-processing Benchmark
+Per-row cost of turning search documents into response rows
+
+Compares the original per-row loop (pytz localize + to_card for every
+document) against ParkingSpace.search_rows on synthetic card documents.
+
+Usage: python benchmarks/search_rows.py [rows] [repeats]
+"""
+import os
+import sys
+import time
+import random
+from datetime import datetime, timedelta
+from bson.objectid import ObjectId
+import pytz
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models.parking import ParkingSpace
+
+IST = pytz.timezone('Asia/Kolkata')
+
+
+def make_docs(count):
+    now = datetime.now(IST).replace(tzinfo=None)
+    docs = []
+    for i in range(count):
+        docs.append({
+            '_id': ObjectId(),
+            'owner_id': ObjectId(),
+            'title': f'Parking {i}',
+            'address': f'{i} MG Road, Koramangala, Bengaluru',
+            'location': {'type': 'Point', 'coordinates': [77.6 + random.random() / 10, 12.9 + random.random() / 10]},
+            'vehicle_type': random.choice(['2-wheeler', '4-wheeler', 'both']),
+            'price_per_hour': random.choice([10, 20, 30]),
+            'total_hours': 8,
+            'available_from': now - timedelta(hours=2),
+            'available_to': now + timedelta(minutes=random.randint(10, 600)),
+            'status': 'approved',
+            'is_available': True,
+            'total_spaces': 2,
+            'available_spaces': 2,
+            'rating': 4.5,
+            'total_reviews': 3,
+            'total_bookings': 7,
+            'created_at': now - timedelta(days=3),
+            'image_count': 1,
+            'first_image': None,
+            'distance': random.random() * 5000
+        })
+    return docs
+
+
+def legacy_rows(docs):
+    """The loop search_parking ran before search_rows"""
+    current_time = datetime.now(IST)
+    rows = []
+    for p in docs:
+        space_dict = ParkingSpace.to_card(p)
+        if p.get('distance') is not None:
+            space_dict['distance_m'] = round(p['distance'])
+        available_to = p['available_to']
+        if available_to.tzinfo is None:
+            available_to = IST.localize(available_to)
+        else:
+            available_to = available_to.astimezone(IST)
+        if available_to > current_time:
+            remaining_hours = max(0, (available_to - current_time).total_seconds() / 3600)
+            space_dict['remaining_hours'] = round(remaining_hours, 1)
+            space_dict['min_booking_hours'] = round(remaining_hours * 0.7, 1)
+        else:
+            space_dict['remaining_hours'] = 0
+            space_dict['min_booking_hours'] = 0
+        rows.append(space_dict)
+    return rows
+
+
+def timed(fn, docs, repeats):
+    best = float('inf')
+    for _ in range(repeats):
+        started = time.perf_counter()
+        fn(docs)
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    repeats = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    docs = make_docs(count)
+
+    legacy = timed(legacy_rows, docs, repeats)
+    batch = timed(ParkingSpace.search_rows, docs, repeats)
+
+    print(f"rows: {count}, best of {repeats}")
+    print(f"  legacy loop : {legacy * 1e6 / count:8.2f} µs/row")
+    print(f"  search_rows : {batch * 1e6 / count:8.2f} µs/row")
+    print(f"  speedup     : {legacy / batch:8.2f}x")
+
+
+if __name__ == '__main__':
+    main()
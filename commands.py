@@ -0,0 +1,52 @@
+"""
+Maintenance CLI Commands
+Run with `flask --app app <command>`
+"""
+
+import click
+from models.database import db
+from models.parking import ParkingSpace
+from models.review import Review
+
+
+def register_commands(app):
+    """Attach maintenance commands to the Flask CLI"""
+
+    @app.cli.command('backfill-locality-tokens')
+    @click.option('--batch-size', default=500, show_default=True, help='Documents per bulk write')
+    def backfill_locality_tokens(batch_size):
+        """Rebuild locality_tokens on listings that predate the current token format"""
+        if db.db is None:
+            click.echo("❌ Database not initialized")
+            return
+        updated = ParkingSpace.backfill_locality_tokens(db, batch_size=batch_size)
+        click.echo(f"✅ Backfilled locality tokens on {updated} parking spaces")
+
+    @app.cli.command('backfill-review-authors')
+    @click.option('--batch-size', default=500, show_default=True, help='Authors per bulk write')
+    def backfill_review_authors(batch_size):
+        """Embed author snapshots on reviews written before they existed"""
+        if db.db is None:
+            click.echo("❌ Database not initialized")
+            return
+        updated = Review.backfill_authors(db, batch_size=batch_size)
+        click.echo(f"✅ Added author snapshots to {updated} reviews")
+
+    @app.cli.command('backfill-images')
+    @click.option('--batch-size', default=50, show_default=True, help='Listings per batch and bulk write')
+    @click.option('--workers', default=2, show_default=True, help='Decode/encode worker processes')
+    @click.option('--restart', is_flag=True, help='Ignore the saved checkpoint and start from the first listing')
+    @click.option('--no-variants', is_flag=True, help='Only extract images, skip thumb/card/full encoding')
+    def backfill_images(batch_size, workers, restart, no_variants):
+        """Extract, dedupe and re-encode listing images (resumable)"""
+        if db.db is None:
+            click.echo("❌ Database not initialized")
+            return
+        from utils.image_backfill import ImageBackfill
+        job = ImageBackfill(db, batch_size=batch_size, workers=workers, variants=not no_variants)
+        if not no_variants and not job.variants:
+            click.echo("⚠️  Pillow is not installed; variants will be skipped")
+        report = job.run(restart=restart, log=click.echo)
+        click.echo("✅ Image backfill complete")
+        for key, value in report.items():
+            click.echo(f"   {key}: {value}")
@@ -1,4 +1,5 @@
 import os
+import tempfile
 from datetime import timedelta
 
 class Config:
@@ -15,6 +16,38 @@ class Config:
     # File Upload (using base64 encoding - no local storage needed)
     MAX_CONTENT_LENGTH = 16 * 1024 * 1024  # 16MB max file size
     ALLOWED_EXTENSIONS = {'png', 'jpg', 'jpeg', 'gif', 'webp'}
+    MAX_IMAGE_BYTES = int(os.environ.get('MAX_IMAGE_BYTES') or 8 * 1024 * 1024)  # Per uploaded image
+    
+    # Search result cache
+    SEARCH_CACHE_MAX_ENTRIES = int(os.environ.get('SEARCH_CACHE_MAX_ENTRIES') or 512)
+    SEARCH_CACHE_TTL_SECONDS = int(os.environ.get('SEARCH_CACHE_TTL_SECONDS') or 60)
+    
+    # Hot-area search snapshots
+    SEARCH_SNAPSHOT_TOP_K = int(os.environ.get('SEARCH_SNAPSHOT_TOP_K') or 32)
+    SEARCH_SNAPSHOT_REFRESH_SECONDS = int(os.environ.get('SEARCH_SNAPSHOT_REFRESH_SECONDS') or 60)
+    
+    # sort=relevance candidate cap and how long a scored list serves later pages
+    RELEVANCE_MAX_CANDIDATES = int(os.environ.get('RELEVANCE_MAX_CANDIDATES') or 2000)
+    RELEVANCE_TTL_SECONDS = int(os.environ.get('RELEVANCE_TTL_SECONDS') or 300)
+    
+    # sort=relevance component weights (see utils/relevance.py)
+    RELEVANCE_WEIGHTS = {
+        'distance': float(os.environ.get('RELEVANCE_WEIGHT_DISTANCE') or 0.35),
+        'price': float(os.environ.get('RELEVANCE_WEIGHT_PRICE') or 0.2),
+        'rating': float(os.environ.get('RELEVANCE_WEIGHT_RATING') or 0.2),
+        'availability': float(os.environ.get('RELEVANCE_WEIGHT_AVAILABILITY') or 0.15),
+        'popularity': float(os.environ.get('RELEVANCE_WEIGHT_POPULARITY') or 0.1)
+    }
+    
+    # Concurrent sub-queries per /api/parking/search/batch request
+    SEARCH_BATCH_WORKERS = int(os.environ.get('SEARCH_BATCH_WORKERS') or 4)
+    
+    # Processes encoding thumb/card/full image variants
+    IMAGE_VARIANT_WORKERS = int(os.environ.get('IMAGE_VARIANT_WORKERS') or 2)
+    
+    # Node-local disk cache of image blobs, shared by all workers
+    IMAGE_CACHE_DIR = os.environ.get('IMAGE_CACHE_DIR') or os.path.join(tempfile.gettempdir(), 'parking-image-cache')
+    IMAGE_CACHE_MAX_BYTES = int(os.environ.get('IMAGE_CACHE_MAX_BYTES') or 256 * 1024 * 1024)
     
     # Google Maps API
     GOOGLE_MAPS_API_KEY = os.environ.get('GOOGLE_MAPS_API_KEY') or 'your-google-maps-api-key'
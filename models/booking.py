@@ -5,6 +5,8 @@ Booking Model - ALL TIMES IN IST
 from datetime import datetime, timedelta
 from bson.objectid import ObjectId
 import pytz
+from utils.occupancy import occupancy_index
+from utils.cursor import encode_cursor, decode_cursor, keyset_condition
 
 # IST timezone
 IST = pytz.timezone('Asia/Kolkata')
@@ -41,6 +43,9 @@ class Booking:
     
     STATUSES = ['pending', 'confirmed', 'active', 'completed', 'cancelled']
     
+    # Newest first with the _id tie-breaker, so pages can be keyset cursors
+    NEWEST_SORT = [('created_at', -1), ('_id', -1)]
+    
     @staticmethod
     def create(db, user_id, parking_id, data):
         """Create a new booking"""
@@ -117,6 +122,8 @@ class Booking:
         }
         
         booking_id = db.insert_one('bookings', booking_data)
+        booking_data['_id'] = booking_id
+        occupancy_index.add_booking(booking_data)
         
         # Update parking availability - deduct number of spots booked
         from models.parking import ParkingSpace
@@ -133,20 +140,16 @@ class Booking:
             return None
     
     @staticmethod
-    def get_by_user(db, user_id, status=None):
-        """Get all bookings for a user"""
+    def user_query(user_id, status=None):
+        """Filter for a renter's bookings"""
         query = {'user_id': ObjectId(user_id)}
         if status:
             query['status'] = status
-        
-        return db.find_many('bookings', query, sort=[('created_at', -1)])
+        return query
     
     @staticmethod
-    def get_by_owner(db, owner_id, status=None):
-        """Get all bookings for parking spaces owned by a user"""
-        from datetime import datetime
-        import pytz
-        
+    def owner_query(owner_id, status=None):
+        """Filter for bookings on a host's parking spaces"""
         query = {'owner_id': ObjectId(owner_id)}
         
         # Filter by status if provided
@@ -155,14 +158,20 @@ class Booking:
         
         # For pending bookings, exclude expired ones (end_time in past)
         if status == 'pending':
-            # Use IST timezone
-            ist = pytz.timezone('Asia/Kolkata')
-            current_time = datetime.now(ist)
-            # Make naive for MongoDB comparison
-            current_time_naive = current_time.replace(tzinfo=None)
-            query['end_time'] = {'$gte': current_time_naive}
-        
-        return db.find_many('bookings', query, sort=[('created_at', -1)])
+            # Make naive IST for MongoDB comparison
+            query['end_time'] = {'$gte': now_ist().replace(tzinfo=None)}
+        
+        return query
+    
+    @staticmethod
+    def get_by_user(db, user_id, status=None, limit=0):
+        """Get a user's bookings, newest first (all of them unless limit is set)"""
+        return db.find_many('bookings', Booking.user_query(user_id, status), sort=Booking.NEWEST_SORT, limit=limit)
+    
+    @staticmethod
+    def get_by_owner(db, owner_id, status=None, limit=0):
+        """Get bookings for a host's parking spaces, newest first (all unless limit is set)"""
+        return db.find_many('bookings', Booking.owner_query(owner_id, status), sort=Booking.NEWEST_SORT, limit=limit)
     
     @staticmethod
     def get_by_parking(db, parking_id, status=None):
@@ -173,13 +182,51 @@ class Booking:
         
         return db.find_many('bookings', query, sort=[('start_time', -1)])
     
+    @staticmethod
+    def page(db, query, limit=50, skip=0, cursor=None, joins=(), with_total=False):
+        """One page of bookings, newest first, in a single aggregation
+        
+        joins is a list of stage lists (see models.database.lookup_one) applied to the page
+        rows only. A cursor from a previous page takes precedence over skip.
+        With with_total the page runs inside a $facet next to a $count of the
+        whole query. Returns (bookings, total or None, next_cursor).
+        """
+        after = decode_cursor(cursor, 'newest') if cursor else None
+        keyset = keyset_condition(Booking.NEWEST_SORT, after) if after else None
+        page_stages = [{'$skip': skip}] if skip and not keyset else []
+        page_stages.append({'$limit': limit + 1})
+        for join in joins:
+            page_stages.extend(join)
+        
+        if with_total:
+            pipeline = [{'$match': query}, {'$sort': dict(Booking.NEWEST_SORT)}]
+            if keyset:
+                page_stages.insert(0, {'$match': keyset})
+            pipeline.append({'$facet': {'rows': page_stages, 'total': [{'$count': 'count'}]}})
+            result = db.aggregate('bookings', pipeline)[0]
+            bookings = result['rows']
+            total = result['total'][0]['count'] if result['total'] else 0
+        else:
+            # The keyset filter joins the match so the compound index does the seek
+            match = {'$and': [query, keyset]} if keyset else query
+            pipeline = [{'$match': match}, {'$sort': dict(Booking.NEWEST_SORT)}] + page_stages
+            bookings = db.aggregate('bookings', pipeline)
+            total = None
+        
+        next_cursor = None
+        if len(bookings) > limit:
+            bookings = bookings[:limit]
+            last = bookings[-1]
+            next_cursor = encode_cursor('newest', [last['created_at'], last['_id']])
+        return bookings, total, next_cursor
+    
     @staticmethod
     def update_status(db, booking_id, status):
         """Update booking status"""
         if status not in Booking.STATUSES:
             raise ValueError(f"Invalid status. Must be one of {Booking.STATUSES}")
         
-        return db.update_one(
+        result = db.update_one(
             'bookings',
             {'_id': ObjectId(booking_id)},
             {'$set': {
@@ -187,6 +234,12 @@ class Booking:
                 'updated_at': now_ist().replace(tzinfo=None)
             }}
         )
+        
+        # Finished bookings no longer hold their spots
+        if status in ['completed', 'cancelled']:
+            occupancy_index.remove_booking(booking_id)
+        
+        return result
     
     @staticmethod
     def accept_by_owner(db, booking_id):
@@ -307,6 +360,7 @@ class Booking:
                 'updated_at': now_ist().replace(tzinfo=None)
             }}
         )
+        occupancy_index.remove_booking(booking_id)
         
         # Restore parking availability - restore number of spots that were booked
         from models.parking import ParkingSpace
@@ -344,6 +398,7 @@ class Booking:
                 'updated_at': now_ist().replace(tzinfo=None)
             }}
         )
+        occupancy_index.remove_booking(booking_id)
         
         # Transfer payment to owner's wallet
         from models.wallet import Wallet
@@ -361,6 +416,8 @@ class Booking:
             {'_id': booking['parking_id']},
             {'$inc': {'total_bookings': 1}}
         )
+        from models.parking import ParkingSpace
+        ParkingSpace.on_listing_changed(db, booking['parking_id'])
         
         return True
     
@@ -40,10 +40,35 @@ class Database:
             self.db.parking_spaces.create_index([('owner_id', ASCENDING)])
             self.db.parking_spaces.create_index([('status', ASCENDING)])
             self.db.parking_spaces.create_index([('vehicle_type', ASCENDING)])
+            # Multikey index for exact/prefix city search on normalized locality tokens
+            self.db.parking_spaces.create_index([('locality_tokens', ASCENDING), ('status', ASCENDING)])
+            # Keyset pagination orders for search (see ParkingSpace.SEARCH_SORTS)
+            self.db.parking_spaces.create_index([
+                ('status', ASCENDING), ('is_available', ASCENDING),
+                ('created_at', DESCENDING), ('_id', DESCENDING)
+            ])
+            self.db.parking_spaces.create_index([
+                ('status', ASCENDING), ('is_available', ASCENDING),
+                ('price_per_hour', ASCENDING), ('_id', ASCENDING)
+            ])
+            self.db.parking_spaces.create_index([
+                ('status', ASCENDING), ('is_available', ASCENDING),
+                ('rating', DESCENDING), ('_id', DESCENDING)
+            ])
+            self.db.parking_spaces.create_index([
+                ('status', ASCENDING), ('is_available', ASCENDING),
+                ('available_to', DESCENDING), ('_id', DESCENDING)
+            ])
             try:
                 self.db.parking_spaces.create_index([
                     ('location.coordinates', '2dsphere')
                 ])
+                # $geoNear ranked search runs against the GeoJSON point itself
+                self.db.parking_spaces.create_index([
+                    ('location', '2dsphere'),
+                    ('status', ASCENDING),
+                    ('is_available', ASCENDING)
+                ])
             except:
                 pass  # Geospatial index might not be supported
             
@@ -52,6 +77,14 @@ class Database:
             self.db.bookings.create_index([('parking_id', ASCENDING)])
             self.db.bookings.create_index([('status', ASCENDING)])
             self.db.bookings.create_index([('start_time', DESCENDING)])
+            self.db.bookings.create_index([('created_at', DESCENDING), ('_id', DESCENDING)])
+            self.db.bookings.create_index([('status', ASCENDING), ('created_at', DESCENDING), ('_id', DESCENDING)])
+            # Renter and host booking views: equality on the party (and status), newest first.
+            # The unfiltered views need their own index; status would sit between party and sort
+            self.db.bookings.create_index([('user_id', ASCENDING), ('created_at', DESCENDING), ('_id', DESCENDING)])
+            self.db.bookings.create_index([('owner_id', ASCENDING), ('created_at', DESCENDING), ('_id', DESCENDING)])
+            self.db.bookings.create_index([('user_id', ASCENDING), ('status', ASCENDING), ('created_at', DESCENDING), ('_id', DESCENDING)])
+            self.db.bookings.create_index([('owner_id', ASCENDING), ('status', ASCENDING), ('created_at', DESCENDING), ('_id', DESCENDING)])
             
             # Payments collection indexes
             self.db.payments.create_index([('booking_id', ASCENDING)])
@@ -69,11 +102,18 @@ class Database:
             # Reviews collection indexes
             self.db.reviews.create_index([('parking_id', ASCENDING)])
             self.db.reviews.create_index([('user_id', ASCENDING)])
+            self.db.reviews.create_index([('parking_id', ASCENDING), ('created_at', DESCENDING), ('_id', DESCENDING)])
             
             # Messages/Chat collection indexes
             self.db.messages.create_index([('booking_id', ASCENDING)])
             self.db.messages.create_index([('sender_id', ASCENDING)])
             self.db.messages.create_index([('created_at', DESCENDING)])
+            # Inbox: a user's messages either side, newest first
+            self.db.messages.create_index([('sender_id', ASCENDING), ('created_at', DESCENDING)])
+            self.db.messages.create_index([('receiver_id', ASCENDING), ('created_at', DESCENDING)])
+            
+            # Image blob chunks are read in order per blob
+            self.db.image_blob_chunks.create_index([('blob', ASCENDING), ('n', ASCENDING)], unique=True)
             
             print("✅ Database indexes created successfully")
         except Exception as e:
@@ -107,6 +147,15 @@ class Database:
             cursor = cursor.limit(limit)
         return list(cursor)
     
+    def find_iter(self, collection_name, query, projection=None, sort=None, limit=0, batch_size=100):
+        """Find multiple documents as a lazy cursor fetched in batches"""
+        cursor = self.db[collection_name].find(query, projection).batch_size(batch_size)
+        if sort:
+            cursor = cursor.sort(sort)
+        if limit > 0:
+            cursor = cursor.limit(limit)
+        return cursor
+    
     def update_one(self, collection_name, query, update, upsert=False):
         """Update a single document - returns UpdateResult object"""
         update.setdefault('$set', {})['updated_at'] = datetime.utcnow()
@@ -126,6 +175,28 @@ class Database:
     def aggregate(self, collection_name, pipeline):
         """Run aggregation pipeline"""
         return list(self.db[collection_name].aggregate(pipeline))
+    
+    def aggregate_iter(self, collection_name, pipeline, batch_size=100):
+        """Run aggregation pipeline as a lazy cursor fetched in batches"""
+        return self.db[collection_name].aggregate(pipeline, batchSize=batch_size)
+
+def lookup_one(collection, local_field, as_field, projection):
+    """Aggregation stages embedding one projected related document as as_field
+    
+    as_field is null when the related document is missing.
+    """
+    return [
+        {'$lookup': {
+            'from': collection,
+            'let': {'id': f'${local_field}'},
+            'pipeline': [
+                {'$match': {'$expr': {'$eq': ['$_id', '$$id']}}},
+                {'$project': projection}
+            ],
+            'as': as_field
+        }},
+        {'$unwind': {'path': f'${as_field}', 'preserveNullAndEmptyArrays': True}}
+    ]
 
 # Global database instance
 db = Database()
@@ -0,0 +1,175 @@
+"""
+Image Blob Model
+Content-addressed image storage keyed by SHA-256
+"""
+
+import base64
+import hashlib
+import io
+import re
+from datetime import datetime
+from bson.binary import Binary
+from utils.upload import sniff_image_type
+
+HASH_PATTERN = re.compile(r'^[0-9a-f]{64}$')
+
+
+class ImageBlob:
+    """Image bytes stored once per distinct content
+
+    image_blobs holds one metadata document per blob (_id is the SHA-256
+    hex digest) and image_blob_chunks holds the bytes in fixed-size
+    chunks. Chunks are written with idempotent upserts before the metadata
+    document, so a blob is only visible once it is complete and concurrent
+    uploads of the same image cannot clash.
+    """
+
+    CHUNK_SIZE = 255 * 1024
+    URL_PREFIX = '/api/parking/images/'
+    
+    # Only these types are stored or served; never trust a declared type
+    # (text/html or image/svg+xml would run script in our origin)
+    IMAGE_TYPES = ('image/png', 'image/jpeg', 'image/gif', 'image/webp')
+
+    @staticmethod
+    def is_hash(value):
+        return isinstance(value, str) and bool(HASH_PATTERN.match(value))
+
+    @staticmethod
+    def url(image_hash, size=None):
+        url = f"{ImageBlob.URL_PREFIX}{image_hash}"
+        return f"{url}?size={size}" if size else url
+
+    @staticmethod
+    def hash_from_url(value):
+        """Blob hash referenced by a blob URL (or a bare hash), else None"""
+        if not isinstance(value, str):
+            return None
+        if value.startswith(ImageBlob.URL_PREFIX):
+            value = value[len(ImageBlob.URL_PREFIX):].split('?', 1)[0]
+        return value if ImageBlob.is_hash(value) else None
+
+    @staticmethod
+    def decode_data_url(value):
+        """(bytes, content_type) for a base64 data URL, else None
+        
+        The type is detected from the bytes; the declared one is ignored.
+        Raises ValueError unless the data is a PNG, JPEG, GIF or WebP image.
+        """
+        if not isinstance(value, str) or not value.startswith('data:') or ',' not in value:
+            return None
+        data = base64.b64decode(value.split(',', 1)[1])
+        content_type = sniff_image_type(data[:16])
+        if content_type is None:
+            raise ValueError("Embedded image is not a PNG, JPEG, GIF or WebP image")
+        return data, content_type
+
+    @staticmethod
+    def get(db, image_hash):
+        """Metadata document for a blob, or None"""
+        if not ImageBlob.is_hash(image_hash):
+            return None
+        return db.get_collection('image_blobs').find_one({'_id': image_hash})
+
+    @staticmethod
+    def resolve(db, image_hash, size=None):
+        """Metadata of the blob to serve: the requested variant when ready, else the original"""
+        blob = ImageBlob.get(db, image_hash)
+        if blob and size and size != 'original':
+            variant_hash = (blob.get('variants') or {}).get(size)
+            variant = ImageBlob.get(db, variant_hash) if variant_hash else None
+            if variant:
+                return variant
+        return blob
+
+    @staticmethod
+    def set_variants(db, image_hash, variants):
+        """Link generated size variants ({name: hash}) from the original blob"""
+        db.get_collection('image_blobs').update_one(
+            {'_id': image_hash},
+            {'$set': {f'variants.{name}': variant_hash for name, variant_hash in variants.items()}}
+        )
+
+    @staticmethod
+    def put(db, data, content_type):
+        """Store bytes (once per distinct content) and return their hash"""
+        image_hash = hashlib.sha256(data).hexdigest()
+        return ImageBlob.put_stream(db, io.BytesIO(data), image_hash, len(data), content_type)
+
+    @staticmethod
+    def put_stream(db, fileobj, image_hash, length, content_type):
+        """Store a file object whose SHA-256 and length are already known
+
+        The file is read one chunk at a time, so only CHUNK_SIZE bytes are
+        held in memory.
+        """
+        if ImageBlob.get(db, image_hash):
+            return image_hash
+
+        chunks = db.get_collection('image_blob_chunks')
+        n = 0
+        while True:
+            data = fileobj.read(ImageBlob.CHUNK_SIZE)
+            if not data:
+                break
+            # Range reads rely on every chunk but the last being full
+            while len(data) < ImageBlob.CHUNK_SIZE:
+                more = fileobj.read(ImageBlob.CHUNK_SIZE - len(data))
+                if not more:
+                    break
+                data += more
+            chunks.update_one(
+                {'blob': image_hash, 'n': n},
+                {'$setOnInsert': {'data': Binary(data)}},
+                upsert=True
+            )
+            n += 1
+
+        db.get_collection('image_blobs').update_one(
+            {'_id': image_hash},
+            {'$setOnInsert': {
+                'content_type': content_type,
+                'length': length,
+                'chunk_size': ImageBlob.CHUNK_SIZE,
+                'chunk_count': n,
+                'created_at': datetime.utcnow()
+            }},
+            upsert=True
+        )
+        return image_hash
+
+    @staticmethod
+    def iter_bytes(db, image_hash, start=0, stop=None, chunk_size=None):
+        """Yield a blob's bytes in [start, stop) chunk by chunk
+
+        Only the chunks overlapping the range are read.
+        """
+        chunk_size = chunk_size or ImageBlob.CHUNK_SIZE
+        query = {'blob': image_hash, 'n': {'$gte': start // chunk_size}}
+        if stop is not None:
+            query['n']['$lte'] = (stop - 1) // chunk_size
+        cursor = db.get_collection('image_blob_chunks').find(query, {'n': 1, 'data': 1}).sort('n', 1)
+        for chunk in cursor:
+            data = bytes(chunk['data'])
+            offset = chunk['n'] * chunk_size
+            lo = max(start - offset, 0)
+            hi = len(data) if stop is None else min(stop - offset, len(data))
+            yield data[lo:hi]
+
+    @staticmethod
+    def store_image_ref(db, value):
+        """Normalize one listing image reference for storage
+
+        Data URLs are moved into the blob store (ValueError unless they
+        hold a supported image) and blob URLs are reduced to their hash;
+        external URLs are kept as they are.
+        """
+        decoded = ImageBlob.decode_data_url(value)
+        if decoded:
+            return ImageBlob.put(db, *decoded)
+        return ImageBlob.hash_from_url(value) or value
+
+    @staticmethod
+    def image_src(value, size=None):
+        """URL a client should load for a stored image reference"""
+        return ImageBlob.url(value, size) if ImageBlob.is_hash(value) else value
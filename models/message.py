@@ -4,10 +4,18 @@ Message/Chat Model
 
 from datetime import datetime
 from bson.objectid import ObjectId
+from models.database import lookup_one
+from utils.cursor import encode_cursor, decode_cursor, keyset_condition
 
 class Message:
     """Message model for in-app chat between users"""
     
+    # Conversations are ordered by their last message, booking id breaks ties
+    CONVERSATION_SORT = [('last_message.created_at', -1), ('_id', -1)]
+    
+    # Counterpart fields shown in the inbox
+    COUNTERPART_PROJECTION = {'name': 1, 'profile_image': 1}
+    
     @staticmethod
     def create(db, sender_id, receiver_id, booking_id, content):
         """Create a new message"""
@@ -32,14 +40,21 @@ class Message:
         )
     
     @staticmethod
-    def get_conversations(db, user_id):
-        """Get all conversations for a user"""
+    def get_conversations(db, user_id, limit=50, cursor=None):
+        """One page of a user's conversations, most recent first
+        
+        A single aggregation groups messages by booking, pages on the last
+        message time and joins the booking and the counterpart user. Each
+        conversation carries 'booking' (participant ids) and 'other_user'.
+        Returns (conversations, next_cursor).
+        """
+        user_oid = ObjectId(user_id)
         pipeline = [
             {
                 '$match': {
                     '$or': [
-                        {'sender_id': ObjectId(user_id)},
-                        {'receiver_id': ObjectId(user_id)}
+                        {'sender_id': user_oid},
+                        {'receiver_id': user_oid}
                     ]
                 }
             },
@@ -55,7 +70,7 @@ class Message:
                             '$cond': [
                                 {
                                     '$and': [
-                                        {'$eq': ['$receiver_id', ObjectId(user_id)]},
+                                        {'$eq': ['$receiver_id', user_oid]},
                                         {'$eq': ['$is_read', False]}
                                     ]
                                 },
@@ -65,13 +80,38 @@ class Message:
                         }
                     }
                 }
-            },
-            {
-                '$sort': {'last_message.created_at': -1}
             }
         ]
+        if cursor:
+            pipeline.append({'$match': keyset_condition(
+                Message.CONVERSATION_SORT,
+                decode_cursor(cursor, 'conversations')
+            )})
+        pipeline += [
+            {'$sort': dict(Message.CONVERSATION_SORT)},
+            {'$limit': limit + 1},
+            *lookup_one('bookings', '_id', 'booking', {'user_id': 1, 'owner_id': 1}),
+            {
+                '$addFields': {
+                    'other_user_id': {
+                        '$cond': [
+                            {'$eq': ['$booking.user_id', user_oid]},
+                            '$booking.owner_id',
+                            '$booking.user_id'
+                        ]
+                    }
+                }
+            },
+            *lookup_one('users', 'other_user_id', 'other_user', Message.COUNTERPART_PROJECTION)
+        ]
         
-        return db.aggregate('messages', pipeline)
+        conversations = db.aggregate('messages', pipeline)
+        next_cursor = None
+        if len(conversations) > limit:
+            conversations = conversations[:limit]
+            last = conversations[-1]
+            next_cursor = encode_cursor('conversations', [last['last_message']['created_at'], last['_id']])
+        return conversations, next_cursor
     
     @staticmethod
     def mark_as_read(db, booking_id, receiver_id):
@@ -4,7 +4,18 @@ Parking Space Model - ALL TIMES IN IST
 
 from datetime import datetime
 from bson.objectid import ObjectId
+import math
 import pytz
+from utils.geo_index import geo_index, INDEX_PROJECTION, naive_ist
+from utils.relevance import relevance_scorer
+from utils.cursor import decode_cursor, keyset_condition, KeysetPage
+from utils.loader import chunked
+from utils.occupancy import occupancy_index
+from utils.search_cache import search_cache
+from utils.suggest import suggest_index, SUGGEST_PROJECTION
+from utils.search_snapshots import search_snapshots
+from models.image_blob import ImageBlob
+from utils.locality import locality_tokens, locality_query, LOCALITY_TOKENS_VERSION
 
 # IST timezone
 IST = pytz.timezone('Asia/Kolkata')
@@ -19,6 +30,101 @@ class ParkingSpace:
     VEHICLE_TYPES = ['2-wheeler', '4-wheeler', '4+wheeler']
     STATUSES = ['pending', 'approved', 'rejected', 'inactive']
     
+    # Keyset orderings for search pages; _id is the tie-breaker
+    SEARCH_SORTS = {
+        'newest': [('created_at', -1), ('_id', -1)],
+        'price': [('price_per_hour', 1), ('_id', 1)],
+        'rating': [('rating', -1), ('_id', -1)],
+        # Remaining hours grow with available_to, so order by the stored field
+        'remaining_hours': [('available_to', -1), ('_id', -1)]
+    }
+    DISTANCE_SORT = [('distance', 1), ('_id', 1)]
+    # Computed per search by utils.relevance, best first
+    RELEVANCE_SORT = [('score', -1), ('_id', -1)]
+    
+    # Map viewports at or past this zoom get individual pins instead of clusters
+    PIN_ZOOM = 15
+    MAX_MAP_PINS = 500
+    
+    # Fields a listing card needs; images are reduced to a count and a
+    # reference to the first one so base64 payloads never leave Mongo
+    CARD_PROJECTION = {
+        'owner_id': 1,
+        'title': 1,
+        'address': 1,
+        'city': 1,
+        'location': 1,
+        'location_link': 1,
+        'vehicle_type': 1,
+        'price_per_hour': 1,
+        'total_hours': 1,
+        'available_from': 1,
+        'available_to': 1,
+        'status': 1,
+        'is_available': 1,
+        'total_spaces': 1,
+        'available_spaces': 1,
+        'rating': 1,
+        'total_reviews': 1,
+        'total_bookings': 1,
+        'created_at': 1,
+        'is_edited': 1,
+        'image_count': {'$size': {'$ifNull': ['$images', []]}},
+        # Plain URLs are cheap to ship; embedded data URLs are served separately
+        'first_image': {'$let': {
+            'vars': {'first': {'$ifNull': [{'$arrayElemAt': ['$images', 0]}, '']}},
+            'in': {'$cond': [
+                {'$eq': [{'$substrCP': ['$$first', 0, 5]}, 'data:']},
+                None,
+                '$$first'
+            ]}
+        }}
+    }
+    
+    # Card fields copied as-is (with defaults) and datetime fields sent as ISO strings
+    CARD_FIELDS = (
+        ('title', None), ('address', None), ('location_link', ''), ('vehicle_type', None),
+        ('price_per_hour', None), ('total_hours', None), ('status', None),
+        ('is_available', False), ('total_spaces', 1), ('available_spaces', 0),
+        ('rating', 0.0), ('total_reviews', 0), ('total_bookings', 0), ('is_edited', False)
+    )
+    CARD_DATE_FIELDS = ('available_from', 'available_to', 'created_at')
+    
+    # Listing embedded in booking views: the card plus what a renter needs to arrive and pay
+    BOOKING_PROJECTION = dict(
+        CARD_PROJECTION,
+        owner_name=1, owner_phone=1, instructions=1, payment_methods=1, upi_id=1
+    )
+    
+    # Fields the in-memory search structures need after a write
+    SYNC_PROJECTION = dict(INDEX_PROJECTION, locality_tokens=1, **SUGGEST_PROJECTION)
+    
+    @staticmethod
+    def on_listing_changed(db, parking_id):
+        """Keep in-memory search structures in sync after a listing write"""
+        try:
+            parking = db.find_one(
+                'parking_spaces',
+                {'_id': ObjectId(parking_id)},
+                ParkingSpace.SYNC_PROJECTION
+            )
+        except Exception as e:
+            print(f"⚠️  Could not reload parking {parking_id} for index sync: {e}")
+            search_cache.clear()
+            search_snapshots.clear()
+            return
+        
+        try:
+            geo_index.sync(parking_id, parking)
+        except Exception as e:
+            print(f"⚠️  Geo index refresh failed for {parking_id}: {e}")
+        try:
+            suggest_index.sync(parking_id, parking)
+        except Exception as e:
+            print(f"⚠️  Suggest index refresh failed for {parking_id}: {e}")
+        search_cache.invalidate_listing(parking_id, parking)
+        search_snapshots.invalidate_listing(parking_id, parking)
+    
     @staticmethod
     def create(db, owner_id, data):
         """Create a new parking space listing"""
@@ -67,6 +173,9 @@ class ParkingSpace:
             'title': data['title'],
             'description': data.get('description', ''),
             'address': data['address'],
+            'city': data.get('city', ''),
+            'locality_tokens': locality_tokens(data['address'], data.get('city')),
+            'locality_version': LOCALITY_TOKENS_VERSION,
             'location': {
                 'type': 'Point',
                 'coordinates': [float(data['longitude']), float(data['latitude'])]
@@ -80,7 +189,7 @@ class ParkingSpace:
             'total_hours': int(data['total_hours']),
             'available_from': parse_datetime(data['available_from']),
             'available_to': parse_datetime(data['available_to']),
-            'images': data.get('images', []),
+            'images': [ImageBlob.store_image_ref(db, image) for image in data.get('images', [])],
             'amenities': data.get('amenities', []),
             'instructions': data.get('instructions', ''),
             'payment_methods': data.get('payment_methods', ['cash']),
@@ -101,28 +210,30 @@ class ParkingSpace:
         
         result = db.insert_one('parking_spaces', parking_data)
         print(f"🎉 Parking created with ID: {result}")
+        ParkingSpace.on_listing_changed(db, result)
         return result
     
     @staticmethod
-    def get_by_id(db, parking_id):
+    def get_by_id(db, parking_id, projection=None):
         """Get parking space by ID"""
         try:
-            return db.find_one('parking_spaces', {'_id': ObjectId(parking_id)})
+            return db.find_one('parking_spaces', {'_id': ObjectId(parking_id)}, projection)
         except:
             return None
     
     @staticmethod
-    def get_by_owner(db, owner_id, status=None):
-        """Get all parking spaces owned by a user"""
+    def get_by_owner(db, owner_id, status=None, projection=None, lazy=False, limit=0):
+        """Get parking spaces owned by a user, newest first (as a cursor when lazy)"""
         query = {'owner_id': ObjectId(owner_id)}
         if status:
             query['status'] = status
         
-        return db.find_many('parking_spaces', query, sort=[('created_at', -1)])
+        find = db.find_iter if lazy else db.find_many
+        return find('parking_spaces', query, projection=projection, sort=[('created_at', -1)], limit=limit)
     
     @staticmethod
-    def search(db, filters):
-        """Search parking spaces with filters"""
+    def _search_query(filters):
+        """Build the non-geo part of a search query"""
         query = {'status': 'approved', 'is_available': True}
         
         # CRITICAL: Filter out expired parking spaces
@@ -141,43 +252,17 @@ class ParkingSpace:
         
         # City filter - CRITICAL for location-based search
         if filters.get('city'):
-            # Case-insensitive city search in address field
-            query['$or'] = [
-                {'city': {'$regex': filters['city'], '$options': 'i'}},
-                {'address': {'$regex': filters['city'], '$options': 'i'}}
-            ]
-        
-        # Location-based search (coordinates)
-        if filters.get('latitude') and filters.get('longitude'):
-            max_distance = filters.get('radius', 5000)  # Default 5km
-            query['location'] = {
-                '$near': {
-                    '$geometry': {
-                        'type': 'Point',
-                        'coordinates': [float(filters['longitude']), float(filters['latitude'])]
-                    },
-                    '$maxDistance': max_distance
-                }
-            }
+            # Prefix match on indexed locality tokens (no collection scan)
+            city_filter = locality_query(filters['city'])
+            if city_filter:
+                query.update(city_filter)
         
         # Vehicle type filter
         if filters.get('vehicle_type'):
-            # Need to handle $or carefully if city filter already added it
-            vehicle_filter = [
+            query['$or'] = [
                 {'vehicle_type': filters['vehicle_type']},
                 {'vehicle_type': 'both'}
             ]
-            
-            # If city filter already added $or, combine them
-            if '$or' in query:
-                # Move city filter to $and and add vehicle filter
-                city_filter = query.pop('$or')
-                query['$and'] = [
-                    {'$or': city_filter},
-                    {'$or': vehicle_filter}
-                ]
-            else:
-                query['$or'] = vehicle_filter
         
         # Price range filter
         if filters.get('max_price'):
@@ -190,7 +275,337 @@ class ParkingSpace:
             query['available_from'] = {'$lte': start}
             query['available_to'] = {'$gte': end}
         
-        return db.find_many('parking_spaces', query, limit=filters.get('limit', 50))
+        return query
+    
+    @staticmethod
+    def search(db, filters):
+        """Search parking spaces with filters"""
+        return ParkingSpace.search_page(db, filters)[0]
+    
+    @staticmethod
+    def _booking_window(filters):
+        """Requested (start, end) as IST-aware datetimes, or None"""
+        if not (filters.get('start_time') and filters.get('end_time')):
+            return None
+        from models.booking import parse_datetime_ist
+        return parse_datetime_ist(filters['start_time']), parse_datetime_ist(filters['end_time'])
+    
+    @staticmethod
+    def _with_free_capacity(db, docs, window):
+        """Drop listings whose spots are all booked at some point in the window"""
+        if not window or not docs:
+            return docs
+        peaks = occupancy_index.peaks(db, [d['_id'] for d in docs], *window)
+        return [
+            d for d in docs
+            if peaks.get(str(d['_id']), 0) < d.get('total_spaces', 1)
+        ]
+    
+    @staticmethod
+    def search_page(db, filters, projection=None):
+        """Search one page of parking spaces
+        
+        Returns (results, next_cursor). next_cursor is None on the last page
+        and otherwise encodes the last row's (sort key, _id), so every page
+        is a bounded range scan instead of a skip. Geo searches attach the
+        computed 'distance' (meters) to every row.
+        """
+        page = ParkingSpace.iter_search(db, filters, projection)
+        results = list(page)
+        return results, page.next_cursor
+    
+    @staticmethod
+    def iter_search(db, filters, projection=None):
+        """One page of search results as a lazy KeysetPage
+        
+        Filters are validated up front; rows then come off the Mongo cursor
+        in LOAD_BATCH chunks, so memory is bounded by the chunk and not by
+        the page. page.next_cursor is set once the page has been read.
+        """
+        query = ParkingSpace._search_query(filters)
+        limit = int(filters.get('limit') or 50)
+        is_geo = bool(filters.get('latitude') and filters.get('longitude'))
+        window = ParkingSpace._booking_window(filters)
+        
+        sort = filters.get('sort') or ('distance' if is_geo else 'newest')
+        if sort == 'distance' and not is_geo:
+            raise ValueError("sort=distance requires latitude and longitude")
+        if sort not in ('distance', 'relevance') and sort not in ParkingSpace.SEARCH_SORTS:
+            raise ValueError(f"Invalid sort. Must be one of {['distance', 'relevance'] + list(ParkingSpace.SEARCH_SORTS)}")
+        if sort == 'distance':
+            sort_spec = ParkingSpace.DISTANCE_SORT
+        elif sort == 'relevance':
+            sort_spec = ParkingSpace.RELEVANCE_SORT
+        else:
+            sort_spec = ParkingSpace.SEARCH_SORTS[sort]
+        
+        cursor = decode_cursor(filters['cursor'], sort) if filters.get('cursor') else None
+        
+        if is_geo:
+            lon, lat = float(filters['longitude']), float(filters['latitude'])
+            max_distance = float(filters.get('radius') or 5000)  # Default 5km
+        
+        if sort == 'relevance':
+            if not is_geo and not filters.get('city'):
+                raise ValueError("sort=relevance requires a city or latitude and longitude")
+            origin = (lon, lat, max_distance) if is_geo else None
+            key = search_cache.make_key(dict(filters, cursor=None, limit=None, view=None))
+            fetch = ParkingSpace._relevance_fetcher(db, query, origin, limit, projection, key, reuse=bool(cursor))
+        elif is_geo and not geo_index.ready:
+            # Index is cold - let Mongo rank with $geoNear
+            fetch = ParkingSpace._geo_near_fetcher(db, query, lon, lat, max_distance, sort_spec, limit, projection)
+        elif sort == 'distance':
+            fetch = ParkingSpace._nearest_fetcher(db, query, lon, lat, max_distance, limit, projection)
+        else:
+            distances = None
+            if is_geo:
+                # Resolve the radius in memory, then filter/sort the ids in Mongo
+                distances = {pid: d for d, pid in geo_index.within_radius(lon, lat, max_distance)}
+                query['_id'] = {'$in': [ObjectId(pid) for pid in distances]}
+            
+            def fetch(after):
+                page_query = {'$and': [query, keyset_condition(sort_spec, after)]} if after else query
+                for doc in db.find_iter('parking_spaces', page_query, projection=projection, sort=sort_spec, limit=limit + 1):
+                    if distances is not None:
+                        doc['distance'] = distances.get(str(doc['_id']))
+                    yield doc
+        
+        rows = ParkingSpace._iter_bookable(db, fetch, cursor, window, sort_spec, limit)
+        return KeysetPage(rows, limit, sort, sort_spec)
+    
+    @staticmethod
+    def _iter_bookable(db, fetch, cursor, window, sort_spec, limit):
+        """Stream fetched rows that still have free capacity in the window
+        
+        fetch(after) yields up to limit + 1 rows past the cursor; capacity
+        is checked per chunk, and the next range is fetched only while fully
+        booked listings left the page short.
+        """
+        while True:
+            fetched = 0
+            last = None
+            for chunk in chunked(fetch(cursor)):
+                fetched += len(chunk)
+                last = chunk[-1]
+                yield from ParkingSpace._with_free_capacity(db, chunk, window)
+            if fetched <= limit:
+                return
+            cursor = [last[field] for field, _ in sort_spec]
+    
+    @staticmethod
+    def _geo_near_fetcher(db, query, lon, lat, max_distance, sort_spec, limit, projection):
+        """Page fetcher backed by a $geoNear aggregation"""
+        def fetch(after):
+            geo_near = {
+                'near': {'type': 'Point', 'coordinates': [lon, lat]},
+                'key': 'location',
+                'distanceField': 'distance',
+                'maxDistance': max_distance,
+                'spherical': True,
+                'query': query
+            }
+            if after and sort_spec is ParkingSpace.DISTANCE_SORT:
+                # Skip everything nearer than the cursor without scanning it
+                geo_near['minDistance'] = float(after[0])
+            
+            pipeline = [{'$geoNear': geo_near}]
+            if after:
+                pipeline.append({'$match': keyset_condition(sort_spec, after)})
+            pipeline.append({'$sort': dict(sort_spec)})
+            pipeline.append({'$limit': limit + 1})
+            if projection:
+                pipeline.append({'$project': dict(projection, distance=1)})
+            return db.aggregate_iter('parking_spaces', pipeline)
+        return fetch
+    
+    @staticmethod
+    def _relevance_fetcher(db, query, origin, limit, projection, key, reuse=False):
+        """Page fetcher ranking candidates by relevance score
+        
+        At most relevance_scorer.max_candidates candidates are scored: the
+        nearest within the radius ($geoNear) for geo searches, the best rated
+        otherwise. Scoring runs in the same aggregation, so only ids and
+        scores come back. The scored list is kept per filter key so later
+        pages reuse it; each page is a heap top-K below the cursor's
+        (score, _id), and only those rows are fetched with the caller's
+        projection.
+        """
+        def compute():
+            cap = relevance_scorer.max_candidates
+            if origin:
+                lon, lat, max_distance = origin
+                candidates = [{'$geoNear': {
+                    'near': {'type': 'Point', 'coordinates': [lon, lat]},
+                    'key': 'location',
+                    'distanceField': 'distance',
+                    'maxDistance': max_distance,
+                    'spherical': True,
+                    'query': query
+                }}]
+            else:
+                candidates = [{'$match': query}, {'$sort': {'rating': -1, '_id': -1}}]
+            candidates.append({'$limit': cap})
+            pipeline = candidates + relevance_scorer.score_stages(radius_m=origin[2] if origin else None)
+            return [
+                (row['score'], row['_id'], row.get('distance'))
+                for row in db.aggregate('parking_spaces', pipeline)
+            ]
+        
+        scored = relevance_scorer.ranked(key, compute, reuse=reuse)
+        
+        def fetch(after):
+            for chunk in chunked(relevance_scorer.top(scored, limit + 1, after)):
+                docs = db.find_many(
+                    'parking_spaces',
+                    {'_id': {'$in': [parking_id for _, parking_id, _ in chunk]}},
+                    projection=projection
+                )
+                by_id = {d['_id']: d for d in docs}
+                for score, parking_id, distance in chunk:
+                    doc = by_id.get(parking_id)
+                    if doc is None:
+                        continue
+                    doc['score'] = score
+                    if distance is not None:
+                        doc['distance'] = distance
+                    yield doc
+        return fetch
+    
+    @staticmethod
+    def _nearest_fetcher(db, query, lon, lat, max_distance, limit, projection):
+        """Page fetcher walking the in-memory geo index nearest-first"""
+        hits = geo_index.within_radius(lon, lat, max_distance)
+        batch_size = max(limit * 2, 20)
+        
+        def fetch(after):
+            remaining = (h for h in hits if h > (float(after[0]), str(after[1]))) if after else hits
+            found = 0
+            for chunk in chunked(remaining, batch_size):
+                docs = db.find_many(
+                    'parking_spaces',
+                    dict(query, _id={'$in': [ObjectId(pid) for _, pid in chunk]}),
+                    projection=projection
+                )
+                by_id = {str(d['_id']): d for d in docs}
+                for distance, pid in chunk:
+                    if pid in by_id:
+                        by_id[pid]['distance'] = distance
+                        yield by_id[pid]
+                        found += 1
+                        if found > limit:
+                            return
+        return fetch
+    
+    @staticmethod
+    def map_view(db, bbox, zoom, vehicle_type=None):
+        """Clusters (or pins, when zoomed in) for a map viewport
+        
+        bbox is (min_lng, min_lat, max_lng, max_lat). Below PIN_ZOOM, listings
+        are grouped into square grid cells sized to roughly a quarter of a
+        map tile, and each cell reports its count, minimum price and centroid.
+        """
+        min_lng, min_lat, max_lng, max_lat = (float(v) for v in bbox)
+        zoom = int(zoom)
+        
+        if zoom >= ParkingSpace.PIN_ZOOM:
+            return {'mode': 'pins', 'pins': ParkingSpace._map_pins(db, bbox, vehicle_type)}
+        
+        cell = 360.0 / (2 ** zoom) / 4
+        
+        if geo_index.ready:
+            clusters = {}
+            for _, entry in geo_index.within_bbox(min_lng, min_lat, max_lng, max_lat):
+                if vehicle_type and entry['vehicle_type'] not in (vehicle_type, 'both'):
+                    continue
+                key = (math.floor(entry['lon'] / cell), math.floor(entry['lat'] / cell))
+                c = clusters.setdefault(key, {'count': 0, 'min_price': None, 'lng_sum': 0.0, 'lat_sum': 0.0})
+                c['count'] += 1
+                c['lng_sum'] += entry['lon']
+                c['lat_sum'] += entry['lat']
+                price = entry['price_per_hour']
+                c['min_price'] = price if c['min_price'] is None else min(c['min_price'], price)
+            groups = [
+                {'count': c['count'], 'min_price': c['min_price'],
+                 'longitude': c['lng_sum'] / c['count'], 'latitude': c['lat_sum'] / c['count']}
+                for c in clusters.values()
+            ]
+        else:
+            match = ParkingSpace._map_match(bbox, vehicle_type)
+            lng = {'$arrayElemAt': ['$location.coordinates', 0]}
+            lat = {'$arrayElemAt': ['$location.coordinates', 1]}
+            pipeline = [
+                {'$match': match},
+                {'$group': {
+                    '_id': {
+                        'x': {'$floor': {'$divide': [lng, cell]}},
+                        'y': {'$floor': {'$divide': [lat, cell]}}
+                    },
+                    'count': {'$sum': 1},
+                    'min_price': {'$min': '$price_per_hour'},
+                    'longitude': {'$avg': lng},
+                    'latitude': {'$avg': lat}
+                }}
+            ]
+            groups = [
+                {'count': g['count'], 'min_price': g['min_price'],
+                 'longitude': g['longitude'], 'latitude': g['latitude']}
+                for g in db.aggregate('parking_spaces', pipeline)
+            ]
+        
+        return {'mode': 'clusters', 'cell_size_deg': cell, 'clusters': groups}
+    
+    @staticmethod
+    def _map_match(bbox, vehicle_type=None):
+        """Mongo filter for live listings inside a viewport"""
+        min_lng, min_lat, max_lng, max_lat = (float(v) for v in bbox)
+        match = {
+            'status': 'approved',
+            'is_available': True,
+            'available_to': {'$gte': now_ist().replace(tzinfo=None)},
+            'location': {'$geoWithin': {'$geometry': {
+                'type': 'Polygon',
+                'coordinates': [[
+                    [min_lng, min_lat], [max_lng, min_lat], [max_lng, max_lat],
+                    [min_lng, max_lat], [min_lng, min_lat]
+                ]]
+            }}}
+        }
+        if vehicle_type:
+            match['vehicle_type'] = {'$in': [vehicle_type, 'both']}
+        return match
+    
+    @staticmethod
+    def _map_pins(db, bbox, vehicle_type=None):
+        """Individual listing pins for a zoomed-in viewport"""
+        min_lng, min_lat, max_lng, max_lat = (float(v) for v in bbox)
+        if geo_index.ready:
+            ids = [
+                ObjectId(pid)
+                for pid, entry in geo_index.within_bbox(min_lng, min_lat, max_lng, max_lat)
+                if not vehicle_type or entry['vehicle_type'] in (vehicle_type, 'both')
+            ][:ParkingSpace.MAX_MAP_PINS]
+            query = {'_id': {'$in': ids}}
+        else:
+            query = ParkingSpace._map_match(bbox, vehicle_type)
+        
+        docs = db.find_many(
+            'parking_spaces',
+            query,
+            projection={'title': 1, 'location': 1, 'price_per_hour': 1, 'vehicle_type': 1, 'available_spaces': 1},
+            limit=ParkingSpace.MAX_MAP_PINS
+        )
+        return [
+            {
+                'id': str(p['_id']),
+                'title': p['title'],
+                'latitude': p['location']['coordinates'][1],
+                'longitude': p['location']['coordinates'][0],
+                'price_per_hour': p['price_per_hour'],
+                'vehicle_type': p['vehicle_type'],
+                'available_spaces': p.get('available_spaces', 0)
+            }
+            for p in docs
+        ]
     
     @staticmethod
     def update(db, parking_id, update_data):
@@ -200,6 +615,23 @@ class ParkingSpace:
         for field in fields_to_remove:
             update_data.pop(field, None)
         
+        # Keep locality tokens in step with the address/city they are built from
+        if 'address' in update_data or 'city' in update_data:
+            current = db.find_one(
+                'parking_spaces',
+                {'_id': ObjectId(parking_id)},
+                {'address': 1, 'city': 1}
+            ) or {}
+            update_data['locality_tokens'] = locality_tokens(
+                update_data.get('address', current.get('address')),
+                update_data.get('city', current.get('city'))
+            )
+            update_data['locality_version'] = LOCALITY_TOKENS_VERSION
+        
+        # Listings hold blob hashes, never embedded image bytes
+        if 'images' in update_data:
+            update_data['images'] = [ImageBlob.store_image_ref(db, image) for image in update_data['images'] or []]
+        
         # Always update the updated_at timestamp
         update_data['updated_at'] = now_ist().replace(tzinfo=None)
         
@@ -212,15 +644,45 @@ class ParkingSpace:
         )
         
         print(f"✅ Update matched: {result.matched_count}, modified: {result.modified_count}")
+        ParkingSpace.on_listing_changed(db, parking_id)
         return result
     
+    @staticmethod
+    def backfill_locality_tokens(db, batch_size=500):
+        """Recompute locality_tokens on listings built with an older token format"""
+        from pymongo import UpdateOne
+        
+        collection = db.get_collection('parking_spaces')
+        cursor = collection.find(
+            {'locality_version': {'$ne': LOCALITY_TOKENS_VERSION}},
+            {'address': 1, 'city': 1}
+        ).batch_size(batch_size)
+        
+        updated = 0
+        operations = []
+        for parking in cursor:
+            operations.append(UpdateOne(
+                {'_id': parking['_id']},
+                {'$set': {
+                    'locality_tokens': locality_tokens(parking.get('address'), parking.get('city')),
+                    'locality_version': LOCALITY_TOKENS_VERSION
+                }}
+            ))
+            if len(operations) >= batch_size:
+                updated += collection.bulk_write(operations, ordered=False).modified_count
+                operations = []
+        if operations:
+            updated += collection.bulk_write(operations, ordered=False).modified_count
+        
+        return updated
+    
     @staticmethod
     def update_status(db, parking_id, status):
         """Update parking space status"""
         if status not in ParkingSpace.STATUSES:
             raise ValueError(f"Invalid status. Must be one of {ParkingSpace.STATUSES}")
         
-        return db.update_one(
+        result = db.update_one(
             'parking_spaces',
             {'_id': ObjectId(parking_id)},
             {'$set': {
@@ -228,6 +690,8 @@ class ParkingSpace:
                 'updated_at': now_ist().replace(tzinfo=None)
             }}
         )
+        ParkingSpace.on_listing_changed(db, parking_id)
+        return result
     
     @staticmethod
     def update_availability(db, parking_id, change):
@@ -240,7 +704,7 @@ class ParkingSpace:
         if new_available < 0 or new_available > parking['total_spaces']:
             return False
         
-        return db.update_one(
+        result = db.update_one(
             'parking_spaces',
             {'_id': ObjectId(parking_id)},
             {'$set': {
@@ -249,6 +713,8 @@ class ParkingSpace:
                 'updated_at': now_ist().replace(tzinfo=None)
             }}
         )
+        ParkingSpace.on_listing_changed(db, parking_id)
+        return result
     
     @staticmethod
     def add_review(db, parking_id, rating):
@@ -263,7 +729,7 @@ class ParkingSpace:
         new_total_reviews = total_reviews + 1
         new_rating = ((current_rating * total_reviews) + rating) / new_total_reviews
         
-        return db.update_one(
+        result = db.update_one(
             'parking_spaces',
             {'_id': ObjectId(parking_id)},
             {'$set': {
@@ -272,16 +738,112 @@ class ParkingSpace:
                 'updated_at': now_ist().replace(tzinfo=None)
             }}
         )
+        ParkingSpace.on_listing_changed(db, parking_id)
+        return result
     
     @staticmethod
-    def get_all_pending(db):
-        """Get all parking spaces pending approval"""
-        return db.find_many(
+    def get_all_pending(db, projection=None, lazy=False):
+        """Get all parking spaces pending approval (as a cursor when lazy)"""
+        find = db.find_iter if lazy else db.find_many
+        return find(
             'parking_spaces',
             {'status': 'pending'},
+            projection=projection,
             sort=[('created_at', -1)]
         )
     
+    @staticmethod
+    def image_url(parking_id, index):
+        """URL that serves one embedded listing image as raw bytes"""
+        return f"/api/parking/{parking_id}/images/{index}"
+    
+    @staticmethod
+    def to_card(parking):
+        """Convert a CARD_PROJECTION document to a lightweight list item
+        
+        images holds at most one thumbnail URL so existing list views keep
+        working; image_count tells the client how many exist in total.
+        """
+        if not parking:
+            return None
+        
+        get = parking.get
+        parking_id = str(parking['_id'])
+        coordinates = parking['location']['coordinates']
+        image_count = get('image_count', 0)
+        thumbnail = ImageBlob.image_src(get('first_image'), 'card') or (ParkingSpace.image_url(parking_id, 0) if image_count else None)
+        
+        card = {key: get(key, default) for key, default in ParkingSpace.CARD_FIELDS}
+        for key in ParkingSpace.CARD_DATE_FIELDS:
+            value = get(key)
+            card[key] = value.isoformat() if hasattr(value, 'isoformat') else value
+        card['id'] = parking_id
+        card['owner_id'] = str(parking['owner_id'])
+        card['latitude'] = coordinates[1]
+        card['longitude'] = coordinates[0]
+        card['images'] = [thumbnail] if thumbnail else []
+        card['image_count'] = image_count
+        card['thumbnail_url'] = thumbnail
+        return card
+    
+    @staticmethod
+    def to_booking_card(parking, include_sensitive=False):
+        """Convert a BOOKING_PROJECTION document to the listing shown on a booking"""
+        card = ParkingSpace.to_card(parking)
+        if card is None:
+            return None
+        card['owner_name'] = parking.get('owner_name', '')
+        card['owner_phone'] = parking.get('owner_phone', '')
+        card['instructions'] = parking.get('instructions', '')
+        card['payment_methods'] = parking.get('payment_methods', ['cash'])
+        if include_sensitive:
+            card['upi_id'] = parking.get('upi_id', '')
+        return card
+    
+    @staticmethod
+    def search_response(db, filters):
+        """Uncached /api/parking/search response body for a filter dict"""
+        full_view = filters.get('view') == 'full'
+        parking_spaces, next_cursor = ParkingSpace.search_page(
+            db,
+            filters,
+            projection=None if full_view else ParkingSpace.CARD_PROJECTION
+        )
+        rows = ParkingSpace.search_rows(parking_spaces, full_view)
+        return {
+            'count': len(rows),
+            'parking_spaces': rows,
+            'next_cursor': next_cursor
+        }
+    
+    @staticmethod
+    def search_rows(parkings, full_view=False):
+        """Serialize search results with remaining_hours and min_booking_hours"""
+        return list(ParkingSpace.iter_search_rows(parkings, full_view))
+    
+    @staticmethod
+    def iter_search_rows(parkings, full_view=False):
+        """Yield serialized search rows one at a time
+        
+        parkings may be a lazy page; each row is read once. The time-derived
+        fields are computed against a single clock read instead of localizing
+        every row with pytz.
+        """
+        now = now_ist().replace(tzinfo=None)
+        serialize = ParkingSpace.to_dict if full_view else ParkingSpace.to_card
+        for parking in parkings:
+            hours = max(0.0, (naive_ist(parking['available_to']) - now).total_seconds() / 3600)
+            row = serialize(parking)
+            distance = parking.get('distance')
+            if distance is not None:
+                row['distance_m'] = round(distance)
+            score = parking.get('score')
+            if score is not None:
+                row['relevance_score'] = round(score, 4)
+            row['remaining_hours'] = round(hours, 1)
+            row['min_booking_hours'] = round(hours * 0.7, 1)
+            yield row
+    
     @staticmethod
     def to_dict(parking, include_sensitive=False):
         """Convert parking document to dictionary
@@ -309,7 +871,7 @@ class ParkingSpace:
             'total_hours': parking['total_hours'],
             'available_from': parking['available_from'].isoformat() if hasattr(parking['available_from'], 'isoformat') else parking['available_from'],
             'available_to': parking['available_to'].isoformat() if hasattr(parking['available_to'], 'isoformat') else parking['available_to'],
-            'images': parking.get('images', []),
+            'images': [ImageBlob.image_src(image) for image in parking.get('images', [])],
             'amenities': parking.get('amenities', []),
             'instructions': parking.get('instructions', ''),
             'payment_methods': parking.get('payment_methods', ['cash']),
@@ -4,15 +4,42 @@ Review Model
 
 from datetime import datetime
 from bson import ObjectId
+from pymongo import UpdateMany
+from utils.cursor import encode_cursor, decode_cursor, keyset_condition
 
 class Review:
-    """Review model for parking spaces"""
+    """Review model for parking spaces
+    
+    Methods accept either the Database helper or the raw pymongo database;
+    both expose get_collection(). Each review embeds a snapshot of its
+    author (name, avatar) so lists never look users up.
+    """
+    
+    # Newest first with the _id tie-breaker, so pages can be keyset cursors
+    NEWEST_SORT = [('created_at', -1), ('_id', -1)]
+    
+    # User fields copied onto reviews
+    AUTHOR_FIELDS = ('name', 'profile_image')
+    
+    @staticmethod
+    def _reviews(db):
+        return db.get_collection('reviews')
+    
+    @staticmethod
+    def author_snapshot(user):
+        """Author fields embedded on a review"""
+        return {field: (user or {}).get(field) for field in Review.AUTHOR_FIELDS}
     
     @staticmethod
     def create(db, user_id, parking_id, data):
         """Create a new review"""
+        author = db.get_collection('users').find_one(
+            {'_id': ObjectId(user_id)},
+            {field: 1 for field in Review.AUTHOR_FIELDS}
+        )
         review = {
             'user_id': ObjectId(user_id),
+            'author': Review.author_snapshot(author),
             'parking_id': ObjectId(parking_id),
             'rating': data.get('rating'),
             'comment': data.get('comment', ''),
@@ -24,7 +51,7 @@ class Review:
         if not review['rating'] or review['rating'] < 1 or review['rating'] > 5:
             raise ValueError('Rating must be between 1 and 5')
         
-        result = db.reviews.insert_one(review)
+        result = Review._reviews(db).insert_one(review)
         
         # Update parking space average rating
         Review.update_parking_rating(db, parking_id)
@@ -33,42 +60,100 @@ class Review:
     
     @staticmethod
     def update_parking_rating(db, parking_id):
-        """Update average rating for a parking space"""
-        reviews = list(db.reviews.find({'parking_id': ObjectId(parking_id)}))
-        
-        if reviews:
-            avg_rating = sum(r['rating'] for r in reviews) / len(reviews)
-            db.parking_spaces.update_one(
-                {'_id': ObjectId(parking_id)},
-                {
-                    '$set': {
-                        'average_rating': round(avg_rating, 2),
-                        'total_reviews': len(reviews),
-                        'updated_at': datetime.utcnow()
-                    }
+        """Update average rating for a parking space
+        
+        Search sorts and relevance scores read 'rating', so it is written
+        next to average_rating and the listing's search entries are resynced.
+        """
+        from models.parking import ParkingSpace
+        
+        reviews = list(Review._reviews(db).find({'parking_id': ObjectId(parking_id)}, {'rating': 1}))
+        avg_rating = round(sum(r['rating'] for r in reviews) / len(reviews), 2) if reviews else 0.0
+        
+        db.get_collection('parking_spaces').update_one(
+            {'_id': ObjectId(parking_id)},
+            {
+                '$set': {
+                    'rating': avg_rating,
+                    'average_rating': avg_rating,
+                    'total_reviews': len(reviews),
+                    'updated_at': datetime.utcnow()
                 }
-            )
+            }
+        )
+        ParkingSpace.on_listing_changed(db, parking_id)
     
     @staticmethod
     def get_by_parking(db, parking_id, limit=None):
         """Get reviews for a parking space"""
-        query = {'parking_id': ObjectId(parking_id)}
-        cursor = db.reviews.find(query).sort('created_at', -1)
+        cursor = Review._reviews(db).find({'parking_id': ObjectId(parking_id)}).sort(Review.NEWEST_SORT)
         
         if limit:
             cursor = cursor.limit(limit)
         
         return list(cursor)
     
+    @staticmethod
+    def page(db, parking_id, limit=20, cursor=None):
+        """One page of a parking space's reviews, newest first
+        
+        A single query on the (parking_id, created_at, _id) index; cursor is
+        the next_cursor of the previous page. Returns (reviews, next_cursor).
+        """
+        query = {'parking_id': ObjectId(parking_id)}
+        if cursor:
+            query = {'$and': [query, keyset_condition(Review.NEWEST_SORT, decode_cursor(cursor, 'newest'))]}
+        reviews = list(Review._reviews(db).find(query).sort(Review.NEWEST_SORT).limit(limit + 1))
+        
+        next_cursor = None
+        if len(reviews) > limit:
+            reviews = reviews[:limit]
+            last = reviews[-1]
+            next_cursor = encode_cursor('newest', [last['created_at'], last['_id']])
+        return reviews, next_cursor
+    
+    @staticmethod
+    def refresh_author(db, user_id, user):
+        """Rewrite the author snapshot on every review by a user"""
+        result = Review._reviews(db).update_many(
+            {'user_id': ObjectId(user_id)},
+            {'$set': {'author': Review.author_snapshot(user)}}
+        )
+        return result.modified_count
+    
+    @staticmethod
+    def backfill_authors(db, batch_size=500):
+        """Set author snapshots on reviews written before they existed
+        
+        Returns the number of reviews updated.
+        """
+        reviews = Review._reviews(db)
+        users = db.get_collection('users')
+        author_ids = reviews.distinct('user_id', {'author': {'$exists': False}})
+        updated = 0
+        for start in range(0, len(author_ids), batch_size):
+            batch = author_ids[start:start + batch_size]
+            found = users.find({'_id': {'$in': batch}}, {field: 1 for field in Review.AUTHOR_FIELDS})
+            operations = [
+                UpdateMany(
+                    {'user_id': user['_id'], 'author': {'$exists': False}},
+                    {'$set': {'author': Review.author_snapshot(user)}}
+                )
+                for user in found
+            ]
+            if operations:
+                updated += reviews.bulk_write(operations, ordered=False).modified_count
+        return updated
+    
     @staticmethod
     def get_by_user(db, user_id):
         """Get reviews by a user"""
-        return list(db.reviews.find({'user_id': ObjectId(user_id)}).sort('created_at', -1))
+        return list(Review._reviews(db).find({'user_id': ObjectId(user_id)}).sort('created_at', -1))
     
     @staticmethod
     def get_by_id(db, review_id):
         """Get a review by ID"""
-        return db.reviews.find_one({'_id': ObjectId(review_id)})
+        return Review._reviews(db).find_one({'_id': ObjectId(review_id)})
     
     @staticmethod
     def update(db, review_id, data):
@@ -85,7 +170,7 @@ class Review:
         if 'comment' in data:
             update_data['comment'] = data['comment']
         
-        result = db.reviews.update_one(
+        result = Review._reviews(db).update_one(
             {'_id': ObjectId(review_id)},
             {'$set': update_data}
         )
@@ -106,7 +191,7 @@ class Review:
         
         parking_id = str(review['parking_id'])
         
-        result = db.reviews.delete_one({'_id': ObjectId(review_id)})
+        result = Review._reviews(db).delete_one({'_id': ObjectId(review_id)})
         
         # Update parking space rating
         if result.deleted_count > 0:
@@ -117,7 +202,7 @@ class Review:
     @staticmethod
     def user_has_reviewed(db, user_id, parking_id):
         """Check if a user has already reviewed a parking space"""
-        review = db.reviews.find_one({
+        review = Review._reviews(db).find_one({
             'user_id': ObjectId(user_id),
             'parking_id': ObjectId(parking_id)
         })
@@ -126,12 +211,18 @@ class Review:
     @staticmethod
     def to_dict(review):
         """Convert review to dictionary"""
+        author = review.get('author') or {}
         return {
             'id': str(review['_id']),
             'user_id': str(review['user_id']),
             'parking_id': str(review['parking_id']),
             'rating': review['rating'],
             'comment': review.get('comment', ''),
+            'user': {
+                'id': str(review['user_id']),
+                'name': author.get('name'),
+                'profile_image': author.get('profile_image')
+            },
             'created_at': review['created_at'].isoformat(),
             'updated_at': review['updated_at'].isoformat()
         }
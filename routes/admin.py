@@ -2,18 +2,31 @@
 Admin Routes
 """
 
-from flask import Blueprint, request, jsonify, current_app
+from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from models.user import User
 from models.parking import ParkingSpace
 from models.booking import Booking
-from models.database import db as database
+from models.database import db as database, lookup_one
 from bson.objectid import ObjectId
-from datetime import datetime
-from utils.timezone import now_ist, IST
+from utils.timezone import now_ist
+from utils.search_cache import search_cache
+from utils.suggest import suggest_index
+from utils.search_snapshots import search_snapshots
+from utils.ndjson import wants_ndjson, ndjson_response
+from utils.image_variants import image_variants
+from utils.disk_cache import image_disk_cache
+from utils.occupancy import occupancy_index
+from utils.loader import get_loader, chunked
 
 admin_bp = Blueprint('admin', __name__)
 
+# Listing and user fields embedded in admin booking rows
+ADMIN_PARKING_PROJECTION = {'title': 1, 'address': 1}
+ADMIN_USER_PROJECTION = {'name': 1, 'email': 1}
+
+MAX_ADMIN_PAGE = 200
+
 def admin_required(fn):
     """Decorator to check if user is admin"""
     @jwt_required()
@@ -98,26 +111,57 @@ def get_dashboard_stats():
         traceback.print_exc()
         return jsonify({'error': 'Failed to get dashboard stats', 'details': str(e)}), 500
 
+@admin_bp.route('/cache-stats', methods=['GET'])
+@admin_required
+def get_cache_stats():
+    """Get hit/miss counters for in-process caches"""
+    try:
+        return jsonify({
+            'search_cache': search_cache.stats(),
+            'occupancy_index': occupancy_index.stats(),
+            'suggest_index': suggest_index.stats(),
+            'search_snapshots': search_snapshots.stats(),
+            'image_variants': image_variants.stats(),
+            'image_disk_cache': image_disk_cache.stats()
+        }), 200
+        
+    except Exception as e:
+        return jsonify({'error': 'Failed to get cache stats', 'details': str(e)}), 500
+
 @admin_bp.route('/parking/pending', methods=['GET'])
 @admin_required
 def get_pending_parking():
     """Get all pending parking spaces"""
     try:
-        parking_spaces = ParkingSpace.get_all_pending(database)
-        
-        # Get owner details for each parking space
-        parking_with_owners = []
-        for parking in parking_spaces:
-            owner = User.get_by_id(database, str(parking['owner_id']))
-            parking_dict = ParkingSpace.to_dict(parking)
-            parking_dict['owner'] = {
-                'id': str(owner['_id']),
-                'name': owner['name'],
-                'email': owner['email'],
-                'phone': owner.get('phone')
-            }
-            parking_with_owners.append(parking_dict)
+        full_view = request.args.get('view', 'card') == 'full'
+        stream = wants_ndjson()
+        parking_spaces = ParkingSpace.get_all_pending(
+            database,
+            projection=None if full_view else ParkingSpace.CARD_PROJECTION,
+            lazy=stream
+        )
+        serialize = ParkingSpace.to_dict if full_view else ParkingSpace.to_card
+        
+        # Get owner details, one users query per batch of listings
+        owners = get_loader().users
+        def with_owners():
+            for chunk in chunked(parking_spaces):
+                owners.prime(parking['owner_id'] for parking in chunk)
+                for parking in chunk:
+                    owner = owners.get(parking['owner_id'])
+                    parking_dict = serialize(parking)
+                    parking_dict['owner'] = {
+                        'id': str(owner['_id']),
+                        'name': owner['name'],
+                        'email': owner['email'],
+                        'phone': owner.get('phone')
+                    }
+                    yield parking_dict
         
+        if stream:
+            return ndjson_response(with_owners())
+        
+        parking_with_owners = list(with_owners())
         return jsonify({
             'count': len(parking_with_owners),
             'parking_spaces': parking_with_owners
@@ -155,6 +199,8 @@ def approve_parking(parking_id):
             }}
         )
         
+        ParkingSpace.on_listing_changed(database, parking_id)
+        
         action_type = "edited listing" if is_edited else "new listing"
         print(f"✅ Admin approved {action_type}: {parking_id}, is_available set to True")
         
@@ -199,32 +245,46 @@ def reject_parking(parking_id):
 def get_all_parking():
     """Get all parking spaces"""
     try:
+        full_view = request.args.get('view', 'card') == 'full'
+        serialize = ParkingSpace.to_dict if full_view else ParkingSpace.to_card
+        
+        stream = wants_ndjson()
+        
         # Get all parking spaces
-        all_parking = database.find_many(
+        find = database.find_iter if stream else database.find_many
+        all_parking = find(
             'parking_spaces',
             {},
+            projection=None if full_view else ParkingSpace.CARD_PROJECTION,
             sort=[('created_at', -1)],
             limit=100
         )
         
-        # Get owner details for each
-        parking_with_owners = []
-        for parking in all_parking:
-            try:
-                owner = User.get_by_id(database, str(parking['owner_id']))
-                if owner:
-                    parking_dict = ParkingSpace.to_dict(parking)
-                    parking_dict['owner'] = {
-                        'id': str(owner['_id']),
-                        'name': owner['name'],
-                        'email': owner['email'],
-                        'phone': owner.get('phone')
-                    }
-                    parking_with_owners.append(parking_dict)
-            except Exception as e:
-                print(f"Error processing parking {parking.get('_id')}: {e}")
-                continue
-        
+        # Get owner details, one users query per batch of listings
+        owners = get_loader().users
+        def with_owners():
+            for chunk in chunked(all_parking):
+                owners.prime(parking['owner_id'] for parking in chunk)
+                for parking in chunk:
+                    try:
+                        owner = owners.get(parking['owner_id'])
+                        if owner:
+                            parking_dict = serialize(parking)
+                            parking_dict['owner'] = {
+                                'id': str(owner['_id']),
+                                'name': owner['name'],
+                                'email': owner['email'],
+                                'phone': owner.get('phone')
+                            }
+                            yield parking_dict
+                    except Exception as e:
+                        print(f"Error processing parking {parking.get('_id')}: {e}")
+                        continue
+        
+        if stream:
+            return ndjson_response(with_owners())
+        
+        parking_with_owners = list(with_owners())
         return jsonify({
             'count': len(parking_with_owners),
             'parking_spaces': parking_with_owners
@@ -330,27 +390,33 @@ def get_all_bookings():
     try:
         status = request.args.get('status')
         skip = int(request.args.get('skip', 0))
-        limit = int(request.args.get('limit', 50))
+        limit = min(int(request.args.get('limit', 50)), MAX_ADMIN_PAGE)
+        if skip < 0 or limit < 1:
+            raise ValueError("skip must be >= 0 and limit >= 1")
         
         query = {}
         if status:
             query['status'] = status
         
-        bookings = database.find_many(
-            'bookings',
+        # Page, total and related listing/renter/owner in one aggregation
+        bookings, total, next_cursor = Booking.page(
+            database,
             query,
-            sort=[('created_at', -1)],
-            limit=limit
+            limit=limit,
+            skip=skip,
+            cursor=request.args.get('cursor'),
+            joins=[
+                lookup_one('parking_spaces', 'parking_id', 'parking', ADMIN_PARKING_PROJECTION),
+                lookup_one('users', 'user_id', 'user', ADMIN_USER_PROJECTION),
+                lookup_one('users', 'owner_id', 'owner', ADMIN_USER_PROJECTION)
+            ],
+            with_total=True
         )
         
-        # Get details for each booking
         bookings_with_details = []
         for booking in bookings:
             try:
-                parking = ParkingSpace.get_by_id(database, str(booking['parking_id']))
-                user = User.get_by_id(database, str(booking['user_id']))
-                owner = User.get_by_id(database, str(booking['owner_id']))
-                
+                parking, user, owner = booking.get('parking'), booking.get('user'), booking.get('owner')
                 if not parking or not user or not owner:
                     continue
                 
@@ -377,9 +443,13 @@ def get_all_bookings():
         
         return jsonify({
             'count': len(bookings_with_details),
+            'total': total,
+            'next_cursor': next_cursor,
             'bookings': bookings_with_details
         }), 200
         
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         print(f"Get bookings error: {e}")
         import traceback
@@ -396,9 +466,11 @@ def get_booking_details(booking_id):
             return jsonify({'error': 'Booking not found'}), 404
         
         # Get related data
-        parking = ParkingSpace.get_by_id(database, str(booking['parking_id']))
-        user = User.get_by_id(database, str(booking['user_id']))
-        owner = User.get_by_id(database, str(booking['owner_id']))
+        loader = get_loader()
+        parking = loader.parking(ADMIN_PARKING_PROJECTION).get(booking['parking_id'])
+        users = loader.users.prime([booking['user_id'], booking['owner_id']])
+        user = users.get(booking['user_id'])
+        owner = users.get(booking['owner_id'])
         
         booking_dict = Booking.to_dict(booking)
         booking_dict['parking'] = {
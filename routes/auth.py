@@ -5,6 +5,7 @@ Authentication Routes
 from flask import Blueprint, request, jsonify, current_app
 from flask_jwt_extended import create_access_token, jwt_required, get_jwt_identity
 from models.user import User
+from models.review import Review
 from models.database import db as database
 import requests
 
@@ -246,6 +247,10 @@ def update_profile():
         # Get updated user
         user = User.get_by_id(database, user_id)
         
+        # Keep the author snapshot on the user's reviews in step
+        if any(field in data for field in Review.AUTHOR_FIELDS):
+            Review.refresh_author(database, user_id, user)
+        
         return jsonify({
             'message': 'Profile updated successfully',
             'user': User.to_dict(user)
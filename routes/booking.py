@@ -9,11 +9,16 @@ from models.parking import ParkingSpace
 from models.user import User
 from models.review import Review
 from models.wallet import Wallet
-from models.database import db as database
+from models.database import db as database, lookup_one
 from datetime import datetime
 
 booking_bp = Blueprint('booking', __name__)
 
+# Renter fields shown to hosts on received bookings
+RENTER_PROJECTION = {'name': 1, 'email': 1, 'phone': 1}
+
+MAX_BOOKING_PAGE = 200
+
 @booking_bp.route('/create', methods=['POST'])
 @jwt_required()
 def create_booking():
@@ -101,64 +106,100 @@ def create_booking():
         traceback.print_exc()
         return jsonify({'error': 'Failed to create booking', 'details': str(e)}), 500
 
+def _booking_page(query, joins):
+    """One page of bookings for the request's skip/limit/cursor args"""
+    skip = int(request.args.get('skip', 0))
+    limit = min(int(request.args.get('limit', 50)), MAX_BOOKING_PAGE)
+    if skip < 0 or limit < 1:
+        raise ValueError("skip must be >= 0 and limit >= 1")
+    bookings, _, next_cursor = Booking.page(
+        database,
+        query,
+        limit=limit,
+        skip=skip,
+        cursor=request.args.get('cursor'),
+        joins=joins
+    )
+    return bookings, next_cursor
+
 @booking_bp.route('/my-bookings', methods=['GET'])
 @jwt_required()
 def get_my_bookings():
-    """Get user's bookings"""
+    """Get user's bookings
+    
+    Paged newest first: limit (default 50, max MAX_BOOKING_PAGE) and
+    cursor; follow next_cursor until it is null to list every booking.
+    """
     try:
         user_id = get_jwt_identity()
         status = request.args.get('status')
         
-        bookings = Booking.get_by_user(database, user_id, status)
+        # Page and parking details in one aggregation
+        bookings, next_cursor = _booking_page(
+            Booking.user_query(user_id, status),
+            [lookup_one('parking_spaces', 'parking_id', 'parking', ParkingSpace.BOOKING_PROJECTION)]
+        )
         
-        # Get parking details for each booking
         bookings_with_details = []
         for booking in bookings:
-            parking = ParkingSpace.get_by_id(database, str(booking['parking_id']))
             booking_dict = Booking.to_dict(booking)
             # Include UPI ID only for confirmed bookings (so user can pay)
             include_upi = booking['status'] == 'confirmed'
-            booking_dict['parking'] = ParkingSpace.to_dict(parking, include_sensitive=include_upi)
+            booking_dict['parking'] = ParkingSpace.to_booking_card(booking.get('parking'), include_sensitive=include_upi)
             bookings_with_details.append(booking_dict)
         
         return jsonify({
             'count': len(bookings_with_details),
+            'next_cursor': next_cursor,
             'bookings': bookings_with_details
         }), 200
         
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': 'Failed to get bookings', 'details': str(e)}), 500
 
 @booking_bp.route('/received-bookings', methods=['GET'])
 @jwt_required()
 def get_received_bookings():
-    """Get bookings for host's parking spaces"""
+    """Get bookings for host's parking spaces
+    
+    Paged like my-bookings; follow next_cursor for older bookings.
+    """
     try:
         user_id = get_jwt_identity()
         status = request.args.get('status')
         
-        bookings = Booking.get_by_owner(database, user_id, status)
+        # Page, parking and renter details in one aggregation
+        bookings, next_cursor = _booking_page(
+            Booking.owner_query(user_id, status),
+            [
+                lookup_one('parking_spaces', 'parking_id', 'parking', ParkingSpace.BOOKING_PROJECTION),
+                lookup_one('users', 'user_id', 'user', RENTER_PROJECTION)
+            ]
+        )
         
-        # Get details for each booking
         bookings_with_details = []
         for booking in bookings:
-            parking = ParkingSpace.get_by_id(database, str(booking['parking_id']))
-            user = User.get_by_id(database, str(booking['user_id']))
+            user = booking.get('user')
             booking_dict = Booking.to_dict(booking)
-            booking_dict['parking'] = ParkingSpace.to_dict(parking)
+            booking_dict['parking'] = ParkingSpace.to_booking_card(booking.get('parking'))
             booking_dict['user'] = {
                 'id': str(user['_id']),
                 'name': user['name'],
                 'email': user['email'],
                 'phone': user['phone']
-            }
+            } if user else None
             bookings_with_details.append(booking_dict)
         
         return jsonify({
             'count': len(bookings_with_details),
+            'next_cursor': next_cursor,
             'bookings': bookings_with_details
         }), 200
         
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': 'Failed to get bookings', 'details': str(e)}), 500
 
@@ -2,14 +2,17 @@
 Chat/Messaging Routes
 """
 
-from flask import Blueprint, request, jsonify, current_app
+from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from models.message import Message
 from models.booking import Booking
-from models.user import User
+from models.database import db as database
+from utils.loader import get_loader
 
 chat_bp = Blueprint('chat', __name__)
 
+MAX_CONVERSATION_PAGE = 100
+
 @chat_bp.route('/send', methods=['POST'])
 @jwt_required()
 def send_message():
@@ -25,7 +28,7 @@ def send_message():
                 return jsonify({'error': f'{field} is required'}), 400
         
         # Get booking to determine receiver
-        booking = Booking.get_by_id(current_app.db, data['booking_id'])
+        booking = Booking.get_by_id(database, data['booking_id'])
         if not booking:
             return jsonify({'error': 'Booking not found'}), 404
         
@@ -39,7 +42,7 @@ def send_message():
         
         # Create message
         message_id = Message.create(
-            current_app.db,
+            database,
             user_id,
             receiver_id,
             data['booking_id'],
@@ -47,7 +50,7 @@ def send_message():
         )
         
         # Get created message
-        message = current_app.db.find_one('messages', {'_id': message_id})
+        message = database.find_one('messages', {'_id': message_id})
         
         return jsonify({
             'message': 'Message sent successfully',
@@ -65,7 +68,7 @@ def get_booking_messages(booking_id):
         user_id = get_jwt_identity()
         
         # Check if user is part of this booking
-        booking = Booking.get_by_id(current_app.db, booking_id)
+        booking = Booking.get_by_id(database, booking_id)
         if not booking:
             return jsonify({'error': 'Booking not found'}), 404
         
@@ -73,15 +76,16 @@ def get_booking_messages(booking_id):
             return jsonify({'error': 'You do not have permission to view these messages'}), 403
         
         # Get messages
-        messages = Message.get_by_booking(current_app.db, booking_id)
+        messages = Message.get_by_booking(database, booking_id)
         
         # Mark messages as read
-        Message.mark_as_read(current_app.db, booking_id, user_id)
+        Message.mark_as_read(database, booking_id, user_id)
         
-        # Get sender details for each message
+        # Get sender details for all messages in one query
+        senders = get_loader().users.prime(m['sender_id'] for m in messages)
         messages_with_users = []
         for message in messages:
-            sender = User.get_by_id(current_app.db, str(message['sender_id']))
+            sender = senders.get(message['sender_id'])
             message_dict = Message.to_dict(message)
             message_dict['sender'] = {
                 'id': str(sender['_id']),
@@ -101,23 +105,32 @@ def get_booking_messages(booking_id):
 @chat_bp.route('/conversations', methods=['GET'])
 @jwt_required()
 def get_conversations():
-    """Get all conversations for current user"""
+    """Get conversations for current user, most recent first
+    
+    Paged: limit (default 50, max MAX_CONVERSATION_PAGE) and cursor;
+    follow next_cursor until it is null for older conversations.
+    """
     try:
         user_id = get_jwt_identity()
         
-        conversations = Message.get_conversations(current_app.db, user_id)
+        limit = min(int(request.args.get('limit', 50)), MAX_CONVERSATION_PAGE)
+        if limit < 1:
+            raise ValueError("limit must be >= 1")
+        
+        # Page, booking and counterpart user in one aggregation
+        conversations, next_cursor = Message.get_conversations(
+            database,
+            user_id,
+            limit=limit,
+            cursor=request.args.get('cursor')
+        )
         
-        # Get booking and user details for each conversation
         conversations_with_details = []
         for conv in conversations:
-            booking = Booking.get_by_id(current_app.db, str(conv['_id']))
-            if not booking:
+            if not conv.get('booking'):
                 continue
             
-            # Determine the other user in the conversation
-            other_user_id = str(booking['owner_id']) if str(booking['user_id']) == user_id else str(booking['user_id'])
-            other_user = User.get_by_id(current_app.db, other_user_id)
-            
+            other_user = conv.get('other_user')
             last_message = conv['last_message']
             
             conversations_with_details.append({
@@ -126,16 +139,19 @@ def get_conversations():
                     'id': str(other_user['_id']),
                     'name': other_user['name'],
                     'profile_image': other_user.get('profile_image')
-                },
+                } if other_user else None,
                 'last_message': Message.to_dict(last_message),
                 'unread_count': conv['unread_count']
             })
         
         return jsonify({
             'count': len(conversations_with_details),
+            'next_cursor': next_cursor,
             'conversations': conversations_with_details
         }), 200
         
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': 'Failed to get conversations', 'details': str(e)}), 500
 
@@ -145,7 +161,7 @@ def get_unread_count():
     """Get total unread message count"""
     try:
         user_id = get_jwt_identity()
-        count = Message.get_unread_count(current_app.db, user_id)
+        count = Message.get_unread_count(database, user_id)
         
         return jsonify({
             'unread_count': count
@@ -2,24 +2,45 @@
 Parking Space Routes
 """
 
-from flask import Blueprint, request, jsonify, current_app
+from flask import Blueprint, request, jsonify, current_app, Response, redirect, send_file
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from models.parking import ParkingSpace
 from models.user import User
 from models.review import Review
+from routes.review import get_parking_reviews
+from models.image_blob import ImageBlob
 from models.database import db as database
+from utils.search_cache import search_cache
+from utils.geo_index import sample_polyline, haversine_m
+from utils.suggest import suggest_index
+from utils.search_snapshots import search_snapshots
+from utils.ndjson import wants_ndjson, ndjson_response
+from utils.image_variants import image_variants, VARIANTS
+from utils.upload import upload_files, receive_image, sniff_image_type, ImageTooLarge
+from utils.disk_cache import image_disk_cache
 from bson.objectid import ObjectId
-from werkzeug.utils import secure_filename
+from werkzeug.exceptions import RequestedRangeNotSatisfiable, RequestEntityTooLarge
 from datetime import datetime
-import os
-import uuid
+import base64
+import math
+from concurrent.futures import ThreadPoolExecutor
 
 parking_bp = Blueprint('parking', __name__)
 
-ALLOWED_EXTENSIONS = {'png', 'jpg', 'jpeg', 'gif'}
+# Content-addressed image responses never change
+IMMUTABLE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
 
-def allowed_file(filename):
-    return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
+# Upper bound on sub-queries (or route sample points) per batch search
+MAX_BATCH_QUERIES = 25
+
+# Upper bound on each batch sub-query's page size
+MAX_BATCH_QUERY_LIMIT = 50
+
+# Largest search radius (and route corridor); the grid index walks every cell inside it
+MAX_SEARCH_RADIUS_M = 50000
+
+# Upper bound on one search page
+MAX_SEARCH_PAGE = 100
 
 @parking_bp.route('/create', methods=['POST'])
 @jwt_required()
@@ -77,41 +98,49 @@ def create_parking():
 @parking_bp.route('/upload-image', methods=['POST'])
 @jwt_required()
 def upload_image():
-    """Upload parking space image - stores as base64 in MongoDB"""
+    """Upload parking space image - stored once in the image blob store"""
     try:
         user_id = get_jwt_identity()
+        max_bytes = current_app.config.get('MAX_IMAGE_BYTES', 8 * 1024 * 1024)
+        too_large = f"Image exceeds the {max_bytes // (1024 * 1024)}MB limit"
         
-        if 'image' not in request.files:
+        # Cap the request body at one image before werkzeug spools it
+        try:
+            files = upload_files(request.environ, max_bytes)
+        except RequestEntityTooLarge:
+            return jsonify({'error': too_large}), 413
+        
+        if 'image' not in files:
             return jsonify({'error': 'No image file provided'}), 400
         
-        file = request.files['image']
+        file = files['image']
         
         if file.filename == '':
             return jsonify({'error': 'No file selected'}), 400
         
-        if not allowed_file(file.filename):
-            return jsonify({'error': 'Invalid file type. Allowed: png, jpg, jpeg, gif'}), 400
-        
-        # Read file as bytes
-        file_bytes = file.read()
-        
-        # Convert to base64
-        import base64
-        base64_image = base64.b64encode(file_bytes).decode('utf-8')
-        
-        # Get file extension
-        file_ext = file.filename.rsplit('.', 1)[1].lower()
-        
-        # Create data URL
-        mime_type = f"image/{file_ext}"
-        if file_ext == 'jpg':
-            mime_type = 'image/jpeg'
+        # Read in chunks: type comes from the magic bytes, not the filename
+        try:
+            upload = receive_image(file.stream, max_bytes)
+        except ImageTooLarge:
+            return jsonify({'error': too_large}), 413
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
         
-        image_data_url = f"data:{mime_type};base64,{base64_image}"
+        try:
+            image_hash = ImageBlob.put_stream(database, upload.file, upload.sha256, upload.length, upload.content_type)
+            
+            # Resized WebP variants are encoded in the background; until they
+            # exist, variant URLs serve the original
+            upload.file.seek(0)
+            image_variants.schedule(database, image_hash, upload.file)
+        finally:
+            upload.close()
         
         return jsonify({
             'message': 'Image uploaded successfully',
-            'url': image_data_url  # Returns data URL that works anywhere
+            'url': ImageBlob.url(image_hash),  # Listings store the hash behind this URL
+            'hash': image_hash,
+            'variants': {size: ImageBlob.url(image_hash, size) for size in VARIANTS}
         }), 200
         
     except Exception as e:
@@ -119,69 +148,227 @@ def upload_image():
         traceback.print_exc()
         return jsonify({'error': 'Failed to upload image', 'details': str(e)}), 500
 
+def _check_radius(value, name='radius'):
+    """Validate a radius in meters against MAX_SEARCH_RADIUS_M; returns it unchanged"""
+    try:
+        radius = float(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"{name} must be a number of meters")
+    if not 0 < radius <= MAX_SEARCH_RADIUS_M:
+        raise ValueError(f"{name} must be between 0 and {MAX_SEARCH_RADIUS_M} meters")
+    return value
+
+def _search_filters(args):
+    """Build a search filter dict from query args (or a batch query object)"""
+    limit = int(args.get('limit', 50))
+    if not 1 <= limit <= MAX_SEARCH_PAGE:
+        raise ValueError(f"limit must be between 1 and {MAX_SEARCH_PAGE}")
+    return {
+        'city': args.get('city'),  # Add city filter
+        'latitude': args.get('latitude'),
+        'longitude': args.get('longitude'),
+        'radius': _check_radius(args.get('radius', 5000)),  # Default 5km
+        'vehicle_type': args.get('vehicle_type'),
+        'max_price': args.get('max_price'),
+        'start_time': args.get('start_time'),
+        'end_time': args.get('end_time'),
+        'limit': limit,
+        'sort': args.get('sort'),
+        'cursor': args.get('cursor'),
+        'view': args.get('view', 'card')
+    }
+
+def _run_search(filters):
+    """Run one search and return the response body, using the search cache"""
+    cache_key = search_cache.make_key(filters)
+    cached = search_cache.get(cache_key)
+    if cached is not None:
+        return cached
+    
+    response_data = ParkingSpace.search_response(database, filters)
+    search_cache.put(cache_key, filters, response_data, [p['id'] for p in response_data['parking_spaces']])
+    return response_data
+
 @parking_bp.route('/search', methods=['GET'])
 def search_parking():
     """Search parking spaces with filters"""
     try:
-        filters = {
-            'city': request.args.get('city'),  # Add city filter
-            'latitude': request.args.get('latitude'),
-            'longitude': request.args.get('longitude'),
-            'radius': request.args.get('radius', 5000),  # Default 5km
-            'vehicle_type': request.args.get('vehicle_type'),
-            'max_price': request.args.get('max_price'),
-            'start_time': request.args.get('start_time'),
-            'end_time': request.args.get('end_time'),
-            'limit': int(request.args.get('limit', 50))
-        }
+        filters = _search_filters(request.args)
         
-        parking_spaces = ParkingSpace.search(database, filters)
+        if wants_ndjson():
+            return _stream_search(filters)
         
-        # Add remaining hours calculation for each parking space
-        from datetime import datetime
-        import pytz
+        # Busy default city searches are served pre-serialized
+        snapshot = search_snapshots.get(filters)
+        if snapshot is not None:
+            return Response(snapshot, mimetype='application/json'), 200
         
-        # Use IST timezone
-        ist = pytz.timezone('Asia/Kolkata')
-        current_time = datetime.now(ist)
+        return jsonify(_run_search(filters)), 200
         
-        spaces_with_time = []
-        for p in parking_spaces:
-            space_dict = ParkingSpace.to_dict(p)
-            
-            # Calculate remaining hours from now until available_to
-            available_to = p['available_to']
-            
-            # If available_to is naive (no timezone), assume it's IST
-            if available_to.tzinfo is None:
-                available_to = ist.localize(available_to)
-            else:
-                # Convert to IST if it has a different timezone
-                available_to = available_to.astimezone(ist)
-            
-            # Make current_time offset-aware if needed for comparison
-            if current_time.tzinfo is None:
-                current_time = ist.localize(current_time)
-            
-            if available_to > current_time:
-                remaining_seconds = (available_to - current_time).total_seconds()
-                remaining_hours = max(0, remaining_seconds / 3600)
-                space_dict['remaining_hours'] = round(remaining_hours, 1)
-                space_dict['min_booking_hours'] = round(remaining_hours * 0.7, 1)
-            else:
-                # Expired parking (shouldn't happen due to search filter, but safety check)
-                space_dict['remaining_hours'] = 0
-                space_dict['min_booking_hours'] = 0
-            
-            spaces_with_time.append(space_dict)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': 'Search failed', 'details': str(e)}), 500
+
+def _stream_search(filters):
+    """NDJSON search response: one listing per line, then {"next_cursor": ...}
+    
+    Listings are serialized as they come off the Mongo cursor. The page
+    token is only known once the page has been read, so it is the last line.
+    """
+    cached = search_cache.get(search_cache.make_key(filters))
+    if cached is not None:
+        return ndjson_response(cached['parking_spaces'] + [{'next_cursor': cached['next_cursor']}])
+    
+    full_view = filters['view'] == 'full'
+    page = ParkingSpace.iter_search(
+        database,
+        filters,
+        projection=None if full_view else ParkingSpace.CARD_PROJECTION
+    )
+    
+    def rows():
+        yield from ParkingSpace.iter_search_rows(page, full_view)
+        yield {'next_cursor': page.next_cursor}
+    
+    return ndjson_response(rows())
+
+@parking_bp.route('/search/batch', methods=['POST'])
+def search_parking_batch():
+    """Run several searches in one request
+    
+    Body is either {"queries": [<search filters>, ...]} or
+    {"route": [[lat, lng], ...], "corridor_m": 1000, ...shared filters}, in
+    which case the route is sampled into overlapping radius searches.
+    Listings are returned once in `parking_spaces`; each query result lists
+    the ids (and distances) it matched.
+    """
+    try:
+        data = request.get_json() or {}
+        
+        if data.get('route'):
+            corridor_m = float(_check_radius(data.get('corridor_m', 1000), 'corridor_m'))
+            points = sample_polyline(data['route'], corridor_m, MAX_BATCH_QUERIES)
+            # Samples sit step apart; a circle of radius hypot(step/2, corridor_m)
+            # still reaches corridor_m off the route halfway between two samples
+            route = [(float(p[0]), float(p[1])) for p in data['route']]
+            spacing = sum(haversine_m(a[1], a[0], b[1], b[0]) for a, b in zip(route, route[1:])) / (MAX_BATCH_QUERIES - 1)
+            step = max(corridor_m, spacing)
+            radius = math.hypot(step / 2, corridor_m)
+            if radius > MAX_SEARCH_RADIUS_M:
+                return jsonify({'error': 'Route is too long to cover with this corridor; split it into shorter legs'}), 400
+            shared = {k: v for k, v in data.items() if k not in ('route', 'corridor_m', 'queries')}
+            queries = [
+                dict(shared, latitude=lat, longitude=lng, radius=radius, sort='distance')
+                for lat, lng in points
+            ]
+        else:
+            queries = data.get('queries') or []
+        
+        if not queries:
+            return jsonify({'error': 'Provide either queries or route'}), 400
+        if not isinstance(queries, list) or not all(isinstance(q, dict) for q in queries):
+            return jsonify({'error': 'queries must be a list of search filter objects'}), 400
+        if len(queries) > MAX_BATCH_QUERIES:
+            return jsonify({'error': f'At most {MAX_BATCH_QUERIES} queries per batch'}), 400
+        
+        filter_sets = [_search_filters(q) for q in queries]
+        for filters in filter_sets:
+            if not 1 <= filters['limit'] <= MAX_BATCH_QUERY_LIMIT:
+                raise ValueError(f"Each batch query limit must be between 1 and {MAX_BATCH_QUERY_LIMIT}")
+        workers = min(current_app.config.get('SEARCH_BATCH_WORKERS', 4), len(filter_sets))
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            outcomes = list(pool.map(_run_batch_query, filter_sets))
+        
+        parking_spaces = {}
+        results = []
+        for i, (response_data, error) in enumerate(outcomes):
+            if error is not None:
+                results.append({'index': i, 'error': error})
+                continue
+            matches = []
+            for space in response_data['parking_spaces']:
+                parking_spaces.setdefault(space['id'], space)
+                match = {'id': space['id']}
+                if 'distance_m' in space:
+                    match['distance_m'] = space['distance_m']
+                matches.append(match)
+            results.append({
+                'index': i,
+                'count': len(matches),
+                'matches': matches,
+                'next_cursor': response_data['next_cursor']
+            })
+        
+        # Distance is per query, so it lives on the match and not on the shared listing
+        for space in parking_spaces.values():
+            space.pop('distance_m', None)
         
         return jsonify({
-            'count': len(spaces_with_time),
-            'parking_spaces': spaces_with_time
+            'count': len(parking_spaces),
+            'parking_spaces': list(parking_spaces.values()),
+            'results': results
         }), 200
         
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
-        return jsonify({'error': 'Search failed', 'details': str(e)}), 500
+        return jsonify({'error': 'Batch search failed', 'details': str(e)}), 500
+
+def _run_batch_query(filters):
+    """(response_data, error) for one batch sub-query; errors stay per query"""
+    try:
+        response_data = _run_search(filters)
+        # Cached bodies are shared, so hand out a copy of each listing
+        return dict(response_data, parking_spaces=[dict(s) for s in response_data['parking_spaces']]), None
+    except ValueError as e:
+        return None, str(e)
+    except Exception as e:
+        return None, f'Search failed: {e}'
+
+@parking_bp.route('/suggest', methods=['GET'])
+def suggest_locations():
+    """Typeahead completions for localities and listing titles"""
+    try:
+        query = request.args.get('q', '')
+        limit = max(1, min(int(request.args.get('limit', 8)), 20))
+        
+        if not suggest_index.ready:
+            suggest_index.build(database)
+        
+        return jsonify({'query': query, 'suggestions': suggest_index.suggest(query, limit)}), 200
+        
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': 'Suggest failed', 'details': str(e)}), 500
+
+@parking_bp.route('/map', methods=['GET'])
+def get_parking_map():
+    """Clustered listing counts (or pins when zoomed in) for a map viewport"""
+    try:
+        required_params = ['min_lat', 'min_lng', 'max_lat', 'max_lng', 'zoom']
+        missing_params = [param for param in required_params if not request.args.get(param)]
+        if missing_params:
+            return jsonify({'error': f'Missing required parameters: {", ".join(missing_params)}'}), 400
+        
+        bbox = (
+            float(request.args['min_lng']),
+            float(request.args['min_lat']),
+            float(request.args['max_lng']),
+            float(request.args['max_lat'])
+        )
+        zoom = max(0, min(int(request.args['zoom']), 22))
+        
+        result = ParkingSpace.map_view(database, bbox, zoom, request.args.get('vehicle_type'))
+        result['zoom'] = zoom
+        
+        return jsonify(result), 200
+        
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': 'Map search failed', 'details': str(e)}), 500
 
 @parking_bp.route('/<parking_id>', methods=['GET'])
 def get_parking_details(parking_id):
@@ -272,6 +459,142 @@ def get_parking_details(parking_id):
         traceback.print_exc()
         return jsonify({'error': 'Failed to get parking details', 'details': str(e)}), 500
 
+@parking_bp.route('/<parking_id>/images/<int:index>', methods=['GET'])
+def get_parking_image(parking_id, index):
+    """Serve one embedded listing image as raw bytes"""
+    try:
+        if not ObjectId.is_valid(parking_id):
+            return jsonify({'error': 'Invalid parking id'}), 400
+        
+        parking = database.find_one(
+            'parking_spaces',
+            {'_id': ObjectId(parking_id)},
+            {'status': 1, 'images': {'$slice': [index, 1]}}
+        )
+        images = (parking or {}).get('images') or []
+        if not images or not images[0]:
+            return jsonify({'error': 'Image not found'}), 404
+        
+        image = images[0]
+        if ImageBlob.is_hash(image):
+            return redirect(ImageBlob.url(image))
+        if not image.startswith('data:') or ',' not in image:
+            # External URLs are linked from the listing itself; never redirect to them
+            return jsonify({'error': 'Image not found'}), 404
+        
+        # The declared type is client-supplied; only serve bytes that really are an image
+        data = base64.b64decode(image.split(',', 1)[1])
+        mime_type = sniff_image_type(data[:16])
+        if mime_type is None:
+            return jsonify({'error': 'Image not found'}), 404
+        
+        return Response(
+            data,
+            mimetype=mime_type,
+            headers={'Cache-Control': 'public, max-age=3600', 'X-Content-Type-Options': 'nosniff'}
+        )
+        
+    except Exception as e:
+        return jsonify({'error': 'Failed to get image', 'details': str(e)}), 500
+
+@parking_bp.route('/images/<image_hash>', methods=['GET'])
+def get_image_blob(image_hash):
+    """Stream a stored image by its SHA-256 hash
+    
+    ?size=thumb|card|full picks a pre-sized WebP variant when one exists.
+    Blobs are content-addressed, so the hash is a strong ETag and responses
+    are cacheable forever; single byte ranges are supported.
+    """
+    try:
+        size = request.args.get('size')
+        if size and size != 'original' and size not in VARIANTS:
+            return jsonify({'error': f"Invalid size. Must be one of {['original'] + list(VARIANTS)}"}), 400
+        
+        # The original's bytes can never change, so a matching ETag needs no lookup
+        if size in (None, 'original') and request.if_none_match.contains(image_hash):
+            return _image_not_modified(image_hash)
+        
+        blob = ImageBlob.resolve(database, image_hash, size)
+        if not blob or blob.get('content_type') not in ImageBlob.IMAGE_TYPES:
+            return jsonify({'error': 'Image not found'}), 404
+        
+        # A variant that is still being encoded falls back to the original;
+        # don't let clients cache that under the variant URL
+        pending_variant = size not in (None, 'original') and blob['_id'] == image_hash
+        if not pending_variant and request.if_none_match.contains(blob['_id']):
+            return _image_not_modified(blob['_id'])
+        
+        headers = {
+            'ETag': f'"{blob["_id"]}"',
+            'Accept-Ranges': 'bytes',
+            'Cache-Control': 'no-cache' if pending_variant else IMMUTABLE_CACHE_CONTROL,
+            'X-Content-Type-Options': 'nosniff'
+        }
+        length = blob['length']
+        chunk_size = blob.get('chunk_size')
+        
+        # Node-local disk cache: send_file handles ranges and conditionals and
+        # hands the file to the server's sendfile path
+        cached_path = None
+        try:
+            cached_path = image_disk_cache.fetch(
+                blob['_id'],
+                length,
+                lambda: ImageBlob.iter_bytes(database, blob['_id'], chunk_size=chunk_size)
+            )
+        except OSError as e:
+            print(f"⚠️  Image disk cache unavailable: {e}")
+        if cached_path:
+            try:
+                response = send_file(
+                    cached_path,
+                    mimetype=blob['content_type'],
+                    etag=blob['_id'],
+                    last_modified=blob.get('created_at'),
+                    conditional=True
+                )
+                response.headers['Cache-Control'] = headers['Cache-Control']
+                response.headers['Accept-Ranges'] = 'bytes'
+                response.headers['X-Content-Type-Options'] = 'nosniff'
+                return response
+            except RequestedRangeNotSatisfiable:
+                headers['Content-Range'] = f'bytes */{length}'
+                return Response(status=416, headers=headers)
+            except FileNotFoundError:
+                pass  # Evicted by another worker in between; stream from Mongo
+        
+        byte_range = request.range
+        if byte_range is not None and (request.if_range.etag in (None, blob['_id'])):
+            span = byte_range.range_for_length(length)
+            if span is None:
+                headers['Content-Range'] = f'bytes */{length}'
+                return Response(status=416, headers=headers)
+            start, stop = span
+            headers['Content-Range'] = f'bytes {start}-{stop - 1}/{length}'
+            headers['Content-Length'] = str(stop - start)
+            return Response(
+                ImageBlob.iter_bytes(database, blob['_id'], start, stop, chunk_size),
+                status=206,
+                mimetype=blob['content_type'],
+                headers=headers
+            )
+        
+        headers['Content-Length'] = str(length)
+        return Response(
+            ImageBlob.iter_bytes(database, blob['_id'], chunk_size=chunk_size),
+            mimetype=blob['content_type'],
+            headers=headers
+        )
+        
+    except Exception as e:
+        return jsonify({'error': 'Failed to get image', 'details': str(e)}), 500
+
+def _image_not_modified(etag):
+    return Response(status=304, headers={
+        'ETag': f'"{etag}"',
+        'Cache-Control': IMMUTABLE_CACHE_CONTROL
+    })
+
 @parking_bp.route('/my-listings', methods=['GET'])
 @jwt_required()
 def get_my_listings():
@@ -284,23 +607,34 @@ def get_my_listings():
         print(f"📝 User_id type: {type(user_id)}")
         print(f"🔑 Converting to ObjectId: {ObjectId(user_id)}")
         
-        parking_spaces = ParkingSpace.get_by_owner(database, user_id, status)
+        full_view = request.args.get('view', 'card') == 'full'
+        serialize = ParkingSpace.to_dict if full_view else ParkingSpace.to_card
+        
+        if wants_ndjson():
+            cursor = ParkingSpace.get_by_owner(
+                database,
+                user_id,
+                status,
+                projection=None if full_view else ParkingSpace.CARD_PROJECTION,
+                lazy=True
+            )
+            return ndjson_response(serialize(p) for p in cursor)
+        
+        parking_spaces = ParkingSpace.get_by_owner(
+            database,
+            user_id,
+            status,
+            projection=None if full_view else ParkingSpace.CARD_PROJECTION
+        )
         
         print(f"✅ Found {len(parking_spaces)} parkings for user {user_id}")
         
         if len(parking_spaces) > 0:
             print(f"📦 First parking owner_id: {parking_spaces[0].get('owner_id')}")
         
-        # Also check ALL parkings to debug
-        all_parkings = database.find_many('parking_spaces', {})
-        print(f"🌐 Total parkings in DB: {len(all_parkings)}")
-        if len(all_parkings) > 0:
-            for p in all_parkings[-3:]:  # Show last 3
-                print(f"  - Parking {p.get('_id')}: owner_id={p.get('owner_id')}, title={p.get('title')}")
-        
         return jsonify({
             'count': len(parking_spaces),
-            'parking_spaces': [ParkingSpace.to_dict(p) for p in parking_spaces]
+            'parking_spaces': [serialize(p) for p in parking_spaces]
         }), 200
         
     except Exception as e:
@@ -412,6 +746,8 @@ def update_parking(parking_id):
             'parking': ParkingSpace.to_dict(updated_parking)
         }), 200
         
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         print(f"❌ Error updating parking: {str(e)}")
         import traceback
@@ -443,27 +779,5 @@ def delete_parking(parking_id):
     except Exception as e:
         return jsonify({'error': 'Failed to delete parking space', 'details': str(e)}), 500
 
-@parking_bp.route('/<parking_id>/reviews', methods=['GET'])
-def get_parking_reviews(parking_id):
-    """Get reviews for a parking space"""
-    try:
-        reviews = Review.get_by_parking(database, parking_id)
-        
-        # Get user details for each review
-        reviews_with_users = []
-        for review in reviews:
-            user = User.get_by_id(database, str(review['user_id']))
-            review_dict = Review.to_dict(review)
-            review_dict['user'] = {
-                'name': user['name'],
-                'profile_image': user.get('profile_image')
-            }
-            reviews_with_users.append(review_dict)
-        
-        return jsonify({
-            'count': len(reviews_with_users),
-            'reviews': reviews_with_users
-        }), 200
-        
-    except Exception as e:
-        return jsonify({'error': 'Failed to get reviews', 'details': str(e)}), 500
+# Same page as /api/review/parking/<parking_id>; one handler serves both paths
+parking_bp.add_url_rule('/<parking_id>/reviews', view_func=get_parking_reviews)
@@ -2,14 +2,15 @@
 Review Routes
 """
 
-from flask import Blueprint, request, jsonify, current_app
+from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from models.review import Review
-from models.booking import Booking
-from models.user import User
+from models.database import db as database
 
 review_bp = Blueprint('review', __name__)
 
+MAX_REVIEW_PAGE = 100
+
 @review_bp.route('/create', methods=['POST'])
 @jwt_required()
 def create_review():
@@ -25,11 +26,11 @@ def create_review():
         parking_id = data['parking_id']
         
         # Check if user has already reviewed this parking space
-        if Review.user_has_reviewed(current_app.db, user_id, parking_id):
+        if Review.user_has_reviewed(database, user_id, parking_id):
             return jsonify({'error': 'You have already reviewed this parking space'}), 400
         
         # Verify user has completed a booking at this parking space
-        completed_booking = current_app.db.bookings.find_one({
+        completed_booking = database.find_one('bookings', {
             'user_id': user_id,
             'parking_id': parking_id,
             'status': 'completed'
@@ -39,10 +40,10 @@ def create_review():
             return jsonify({'error': 'You can only review parking spaces you have used'}), 403
         
         # Create review
-        review_id = Review.create(current_app.db, user_id, parking_id, data)
+        review_id = Review.create(database, user_id, parking_id, data)
         
         # Get created review
-        review = Review.get_by_id(current_app.db, str(review_id))
+        review = Review.get_by_id(database, str(review_id))
         
         return jsonify({
             'message': 'Review created successfully',
@@ -56,29 +57,32 @@ def create_review():
 
 @review_bp.route('/parking/<parking_id>', methods=['GET'])
 def get_parking_reviews(parking_id):
-    """Get all reviews for a parking space"""
+    """Get reviews for a parking space, newest first
+    
+    Paged: limit (default 20, max MAX_REVIEW_PAGE) and cursor; follow
+    next_cursor until it is null to read every review.
+    """
     try:
-        limit = request.args.get('limit', type=int)
-        
-        reviews = Review.get_by_parking(current_app.db, parking_id, limit)
-        
-        # Get user details for each review
-        reviews_with_users = []
-        for review in reviews:
-            user = User.get_by_id(current_app.db, str(review['user_id']))
-            review_dict = Review.to_dict(review)
-            review_dict['user'] = {
-                'id': str(user['_id']),
-                'name': user['name'],
-                'profile_image': user.get('profile_image')
-            }
-            reviews_with_users.append(review_dict)
+        limit = min(request.args.get('limit', 20, type=int), MAX_REVIEW_PAGE)
+        if limit < 1:
+            raise ValueError("limit must be >= 1")
+        
+        # Reviews carry their author snapshot, so a page is one indexed query
+        reviews, next_cursor = Review.page(
+            database,
+            parking_id,
+            limit=limit,
+            cursor=request.args.get('cursor')
+        )
         
         return jsonify({
-            'count': len(reviews_with_users),
-            'reviews': reviews_with_users
+            'count': len(reviews),
+            'next_cursor': next_cursor,
+            'reviews': [Review.to_dict(r) for r in reviews]
         }), 200
         
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': 'Failed to get reviews', 'details': str(e)}), 500
 
@@ -89,7 +93,7 @@ def get_my_reviews():
     try:
         user_id = get_jwt_identity()
         
-        reviews = Review.get_by_user(current_app.db, user_id)
+        reviews = Review.get_by_user(database, user_id)
         
         return jsonify({
             'count': len(reviews),
@@ -107,7 +111,7 @@ def update_review(review_id):
         user_id = get_jwt_identity()
         
         # Check if review exists and belongs to user
-        review = Review.get_by_id(current_app.db, review_id)
+        review = Review.get_by_id(database, review_id)
         if not review:
             return jsonify({'error': 'Review not found'}), 404
         
@@ -117,10 +121,10 @@ def update_review(review_id):
         data = request.get_json()
         
         # Update review
-        Review.update(current_app.db, review_id, data)
+        Review.update(database, review_id, data)
         
         # Get updated review
-        updated_review = Review.get_by_id(current_app.db, review_id)
+        updated_review = Review.get_by_id(database, review_id)
         
         return jsonify({
             'message': 'Review updated successfully',
@@ -140,7 +144,7 @@ def delete_review(review_id):
         user_id = get_jwt_identity()
         
         # Check if review exists and belongs to user
-        review = Review.get_by_id(current_app.db, review_id)
+        review = Review.get_by_id(database, review_id)
         if not review:
             return jsonify({'error': 'Review not found'}), 404
         
@@ -148,7 +152,7 @@ def delete_review(review_id):
             return jsonify({'error': 'You do not have permission to delete this review'}), 403
         
         # Delete review
-        Review.delete(current_app.db, review_id)
+        Review.delete(database, review_id)
         
         return jsonify({
             'message': 'Review deleted successfully'
@@ -161,19 +165,12 @@ def delete_review(review_id):
 def get_review(review_id):
     """Get a specific review by ID"""
     try:
-        review = Review.get_by_id(current_app.db, review_id)
+        review = Review.get_by_id(database, review_id)
         
         if not review:
             return jsonify({'error': 'Review not found'}), 404
         
-        # Get user details
-        user = User.get_by_id(current_app.db, str(review['user_id']))
         review_dict = Review.to_dict(review)
-        review_dict['user'] = {
-            'id': str(user['_id']),
-            'name': user['name'],
-            'profile_image': user.get('profile_image')
-        }
         
         return jsonify({
             'review': review_dict
@@ -2,20 +2,25 @@
 User Routes
 """
 
-from flask import Blueprint, request, jsonify, current_app
+from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from models.user import User
 from models.wallet import Wallet
 from models.booking import Booking
 from models.parking import ParkingSpace
+from models.database import db as database
+from utils.loader import get_loader
 
 user_bp = Blueprint('user', __name__)
 
+# Rows per list on the dashboard
+DASHBOARD_RECENT = 5
+
 @user_bp.route('/profile/<user_id>', methods=['GET'])
 def get_user_profile(user_id):
     """Get public user profile"""
     try:
-        user = User.get_by_id(current_app.db, user_id)
+        user = User.get_by_id(database, user_id)
         
         if not user:
             return jsonify({'error': 'User not found'}), 404
@@ -23,21 +28,21 @@ def get_user_profile(user_id):
         # Get user stats
         if user['role'] == 'host':
             # Get host stats
-            total_listings = current_app.db.count_documents(
+            total_listings = database.count_documents(
                 'parking_spaces',
                 {'owner_id': user['_id']}
             )
-            active_listings = current_app.db.count_documents(
+            active_listings = database.count_documents(
                 'parking_spaces',
                 {'owner_id': user['_id'], 'status': 'approved'}
             )
-            total_bookings = current_app.db.count_documents(
+            total_bookings = database.count_documents(
                 'bookings',
                 {'owner_id': user['_id'], 'status': 'completed'}
             )
             
             # Calculate average rating from parking spaces
-            parking_spaces = ParkingSpace.get_by_owner(current_app.db, user_id)
+            parking_spaces = ParkingSpace.get_by_owner(database, user_id)
             total_rating = sum(p.get('rating', 0) for p in parking_spaces)
             avg_rating = total_rating / len(parking_spaces) if parking_spaces else 0
             
@@ -49,11 +54,11 @@ def get_user_profile(user_id):
             }
         else:
             # Get driver stats
-            total_bookings = current_app.db.count_documents(
+            total_bookings = database.count_documents(
                 'bookings',
                 {'user_id': user['_id']}
             )
-            completed_bookings = current_app.db.count_documents(
+            completed_bookings = database.count_documents(
                 'bookings',
                 {'user_id': user['_id'], 'status': 'completed'}
             )
@@ -79,25 +84,27 @@ def get_user_dashboard():
     """Get user dashboard data"""
     try:
         user_id = get_jwt_identity()
-        user = User.get_by_id(current_app.db, user_id)
+        user = User.get_by_id(database, user_id)
         
         if not user:
             return jsonify({'error': 'User not found'}), 404
         
         # Get wallet balance
-        wallet = Wallet.get_by_user_id(current_app.db, user_id)
+        wallet = Wallet.get_by_user_id(database, user_id)
         
         # Get recent bookings
-        recent_bookings = Booking.get_by_user(current_app.db, user_id)[:5]
+        recent_bookings = Booking.get_by_user(database, user_id, limit=DASHBOARD_RECENT)
+        loader = get_loader()
+        booked_listings = loader.parking(ParkingSpace.CARD_PROJECTION).prime(b['parking_id'] for b in recent_bookings)
         bookings_with_details = []
         for booking in recent_bookings:
-            parking = ParkingSpace.get_by_id(current_app.db, str(booking['parking_id']))
+            parking = booked_listings.get(booking['parking_id'])
             booking_dict = Booking.to_dict(booking)
             booking_dict['parking'] = {
                 'id': str(parking['_id']),
                 'title': parking['title'],
                 'address': parking['address'],
-                'images': parking.get('images', [])
+                'images': ParkingSpace.to_card(parking)['images']
             }
             bookings_with_details.append(booking_dict)
         
@@ -110,14 +117,22 @@ def get_user_dashboard():
         # If user is a host, add host-specific data
         if user['role'] in ['host', 'admin']:
             # Get host listings
-            listings = ParkingSpace.get_by_owner(current_app.db, user_id)[:5]
+            my_listings = ParkingSpace.get_by_owner(
+                database,
+                user_id,
+                projection=ParkingSpace.CARD_PROJECTION,
+                limit=DASHBOARD_RECENT
+            )
             
             # Get received bookings
-            received_bookings = Booking.get_by_owner(current_app.db, user_id)[:5]
+            received_bookings = Booking.get_by_owner(database, user_id, limit=DASHBOARD_RECENT)
+            # Card projection covers the title; listings booked above are already loaded
+            booked_listings.prime(b['parking_id'] for b in received_bookings)
+            renters = loader.users.prime(b['user_id'] for b in received_bookings)
             received_with_details = []
             for booking in received_bookings:
-                parking = ParkingSpace.get_by_id(current_app.db, str(booking['parking_id']))
-                renter = User.get_by_id(current_app.db, str(booking['user_id']))
+                parking = booked_listings.get(booking['parking_id'])
+                renter = renters.get(booking['user_id'])
                 booking_dict = Booking.to_dict(booking)
                 booking_dict['parking'] = {
                     'id': str(parking['_id']),
@@ -129,7 +144,7 @@ def get_user_dashboard():
                 }
                 received_with_details.append(booking_dict)
             
-            dashboard_data['my_listings'] = [ParkingSpace.to_dict(p) for p in listings]
+            dashboard_data['my_listings'] = [ParkingSpace.to_card(p) for p in my_listings]
             dashboard_data['received_bookings'] = received_with_details
         
         return jsonify(dashboard_data), 200
@@ -148,13 +163,13 @@ def get_notifications():
         # For now, return based on bookings and messages
         from models.message import Message
         
-        unread_messages = Message.get_unread_count(current_app.db, user_id)
+        unread_messages = Message.get_unread_count(database, user_id)
         
         # Get pending booking confirmations (for hosts)
-        pending_confirmations = current_app.db.count_documents(
+        pending_confirmations = database.count_documents(
             'bookings',
             {
-                'owner_id': current_app.db.find_one('users', {'_id': current_app.db.db['users'].find_one({'_id': user_id})})['_id'],
+                'owner_id': database.find_one('users', {'_id': database.db['users'].find_one({'_id': user_id})})['_id'],
                 'status': 'pending',
                 'payment_status': 'completed',
                 'is_confirmed_by_owner': False
@@ -177,7 +192,7 @@ def get_user_stats():
     """Get detailed user statistics"""
     try:
         user_id = get_jwt_identity()
-        user = User.get_by_id(current_app.db, user_id)
+        user = User.get_by_id(database, user_id)
         
         if not user:
             return jsonify({'error': 'User not found'}), 404
@@ -185,19 +200,19 @@ def get_user_stats():
         stats = {}
         
         # Common stats
-        wallet = Wallet.get_by_user_id(current_app.db, user_id)
+        wallet = Wallet.get_by_user_id(database, user_id)
         stats['wallet_balance'] = wallet['balance'] if wallet else 0
         
         # Booking stats
-        total_bookings = current_app.db.count_documents(
+        total_bookings = database.count_documents(
             'bookings',
             {'user_id': user['_id']}
         )
-        completed_bookings = current_app.db.count_documents(
+        completed_bookings = database.count_documents(
             'bookings',
             {'user_id': user['_id'], 'status': 'completed'}
         )
-        active_bookings = current_app.db.count_documents(
+        active_bookings = database.count_documents(
             'bookings',
             {'user_id': user['_id'], 'status': {'$in': ['confirmed', 'active']}}
         )
@@ -210,11 +225,11 @@ def get_user_stats():
         
         # Host-specific stats
         if user['role'] in ['host', 'admin']:
-            total_listings = current_app.db.count_documents(
+            total_listings = database.count_documents(
                 'parking_spaces',
                 {'owner_id': user['_id']}
             )
-            active_listings = current_app.db.count_documents(
+            active_listings = database.count_documents(
                 'parking_spaces',
                 {'owner_id': user['_id'], 'status': 'approved', 'is_available': True}
             )
@@ -224,7 +239,7 @@ def get_user_stats():
                 {'$match': {'owner_id': user['_id'], 'status': 'completed'}},
                 {'$group': {'_id': None, 'total': {'$sum': '$total_price'}}}
             ]
-            earnings_result = current_app.db.aggregate('bookings', earnings_pipeline)
+            earnings_result = database.aggregate('bookings', earnings_pipeline)
             total_earnings = earnings_result[0]['total'] if earnings_result else 0
             
             stats['hosting'] = {
@@ -0,0 +1,92 @@
+"""
+Keyset Cursor Utility
+Opaque, URL-safe page tokens holding the last row's sort key
+"""
+import base64
+import json
+from datetime import datetime
+from bson.objectid import ObjectId
+
+
+def _encode_value(value):
+    if isinstance(value, datetime):
+        return {'$dt': value.isoformat()}
+    if isinstance(value, ObjectId):
+        return {'$oid': str(value)}
+    return value
+
+
+def _decode_value(value):
+    if isinstance(value, dict):
+        if '$dt' in value:
+            return datetime.fromisoformat(value['$dt'])
+        if '$oid' in value:
+            return ObjectId(value['$oid'])
+    return value
+
+
+def encode_cursor(sort, values):
+    """Encode the sort mode and the last row's key values into a token"""
+    payload = json.dumps(
+        {'s': sort, 'v': [_encode_value(v) for v in values]},
+        separators=(',', ':')
+    )
+    return base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_cursor(token, sort):
+    """Decode a token produced by encode_cursor for the same sort mode"""
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+        values = [_decode_value(v) for v in payload['v']]
+    except Exception:
+        raise ValueError("Invalid cursor")
+    if payload.get('s') != sort:
+        raise ValueError("Cursor does not match the requested sort order")
+    return values
+
+
+def keyset_condition(sort_spec, values):
+    """Mongo filter for rows strictly after `values` in `sort_spec` order
+
+    sort_spec is a pymongo sort list ending with the _id tie-breaker, e.g.
+    [('price_per_hour', 1), ('_id', 1)].
+    """
+    clauses = []
+    for i, (field, direction) in enumerate(sort_spec):
+        clause = {f: values[j] for j, (f, _) in enumerate(sort_spec[:i])}
+        clause[field] = {'$gt' if direction == 1 else '$lt': values[i]}
+        clauses.append(clause)
+    return {'$or': clauses}
+
+
+class KeysetPage:
+    """Lazy page of at most `limit` rows from a stream in `sort_spec` order
+
+    Iterating yields the rows as they are pulled. The stream is read one
+    row past the page, so next_cursor (None on the last page) is set once
+    iteration finishes.
+    """
+
+    def __init__(self, rows, limit, sort, sort_spec):
+        self._rows = rows
+        self.limit = limit
+        self.sort = sort
+        self.sort_spec = sort_spec
+        self.next_cursor = None
+
+    def __iter__(self):
+        rows = iter(self._rows)
+        last = None
+        try:
+            for count, row in enumerate(rows):
+                if count == self.limit:
+                    self.next_cursor = encode_cursor(self.sort, [last[field] for field, _ in self.sort_spec])
+                    break
+                last = row
+                yield row
+        finally:
+            close = getattr(rows, 'close', None)
+            if close:
+                close()
@@ -0,0 +1,136 @@
+"""
+Image Disk Cache
+Size-bounded on-disk LRU of image blobs, shared by every worker on a node
+"""
+import os
+import tempfile
+import threading
+
+
+class ImageDiskCache:
+    """Blob bytes cached as files named by their hash
+
+    Files are written to a temp name and renamed into place, so workers
+    sharing the directory never see partial files. Recency is the file
+    mtime, refreshed on every hit (atime is often disabled on servers).
+    After roughly a tenth of max_bytes has been written, the directory is
+    scanned and the least recently used files are removed until usage is
+    back under 90% of max_bytes. Counters are per worker process.
+    """
+
+    def __init__(self, directory=None, max_bytes=256 * 1024 * 1024):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._written_since_scan = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.disk_bytes = None
+
+    def configure(self, directory=None, max_bytes=None):
+        if directory is not None:
+            self.directory = directory
+        if max_bytes is not None:
+            self.max_bytes = int(max_bytes)
+
+    @property
+    def enabled(self):
+        return bool(self.directory) and self.max_bytes > 0
+
+    def _path(self, key):
+        return os.path.join(self.directory, key[:2], key)
+
+    def fetch(self, key, length, read_chunks):
+        """Path of the cached file for key, filling it from read_chunks() on a miss
+
+        Returns None when the cache is disabled or the blob is too large to
+        be worth caching.
+        """
+        if not self.enabled or length > self.max_bytes // 10:
+            return None
+        path = self._path(key)
+        try:
+            os.utime(path, None)
+            with self._lock:
+                self.hits += 1
+            return path
+        except FileNotFoundError:
+            pass
+
+        with self._lock:
+            self.misses += 1
+        folder = os.path.dirname(path)
+        os.makedirs(folder, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=folder, prefix='.tmp-')
+        try:
+            with os.fdopen(fd, 'wb') as out:
+                for chunk in read_chunks():
+                    out.write(chunk)
+            os.replace(temp_path, path)
+        except Exception:
+            if os.path.exists(temp_path):
+                os.unlink(temp_path)
+            raise
+
+        with self._lock:
+            self._written_since_scan += length
+            scan = self._written_since_scan >= self.max_bytes // 10
+            if scan:
+                self._written_since_scan = 0
+        if scan:
+            self.evict()
+        return path
+
+    def evict(self):
+        """Remove least recently used files until usage is under 90% of max_bytes"""
+        if not self.enabled or not os.path.isdir(self.directory):
+            return
+        files = []
+        total = 0
+        for folder in os.scandir(self.directory):
+            if not folder.is_dir():
+                continue
+            for entry in os.scandir(folder.path):
+                if entry.name.startswith('.tmp-'):
+                    continue
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue
+                files.append((stat.st_mtime, stat.st_size, entry.path))
+                total += stat.st_size
+
+        removed = 0
+        if total > self.max_bytes:
+            target = self.max_bytes * 0.9
+            for _, size, path in sorted(files):
+                if total <= target:
+                    break
+                try:
+                    os.unlink(path)
+                except FileNotFoundError:
+                    pass
+                total -= size
+                removed += 1
+        with self._lock:
+            self.evictions += removed
+            self.disk_bytes = total
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'enabled': self.enabled,
+                'directory': self.directory,
+                'max_bytes': self.max_bytes,
+                'disk_bytes': self.disk_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0,
+                'evictions': self.evictions
+            }
+
+
+# Global image disk cache instance
+image_disk_cache = ImageDiskCache()
@@ -0,0 +1,260 @@
+"""
+In-memory Geospatial Grid Index
+Answers radius and k-nearest lookups for live parking listings without a Mongo $near scan
+"""
+import heapq
+import math
+import threading
+from datetime import datetime
+import pytz
+
+IST = pytz.timezone('Asia/Kolkata')
+
+EARTH_RADIUS_M = 6371000
+METERS_PER_DEGREE = 111320
+
+# Fields needed to place and filter a listing in the index
+INDEX_PROJECTION = {
+    'location': 1,
+    'status': 1,
+    'is_available': 1,
+    'available_to': 1,
+    'vehicle_type': 1,
+    'price_per_hour': 1
+}
+
+
+def haversine_m(lon1, lat1, lon2, lat2):
+    """Great-circle distance in meters between two lon/lat points"""
+    phi1 = math.radians(lat1)
+    phi2 = math.radians(lat2)
+    dphi = phi2 - phi1
+    dlmb = math.radians(lon2 - lon1)
+    a = math.sin(dphi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(dlmb / 2) ** 2
+    return 2 * EARTH_RADIUS_M * math.asin(min(1.0, math.sqrt(a)))
+
+
+def sample_polyline(points, spacing_m, max_points=None):
+    """Evenly spaced [(lat, lng)] samples along a [[lat, lng], ...] polyline
+
+    Samples are spacing_m apart (widened if that would exceed max_points),
+    always including both endpoints.
+    """
+    points = [(float(p[0]), float(p[1])) for p in points]
+    if len(points) < 2:
+        return points
+    legs = [haversine_m(a[1], a[0], b[1], b[0]) for a, b in zip(points, points[1:])]
+    total = sum(legs)
+    if max_points and max_points > 1:
+        spacing_m = max(spacing_m, total / (max_points - 1))
+
+    samples = [points[0]]
+    travelled = 0.0
+    next_at = spacing_m
+    for (a, b), leg in zip(zip(points, points[1:]), legs):
+        while leg > 0 and next_at <= travelled + leg and next_at < total:
+            t = (next_at - travelled) / leg
+            samples.append((a[0] + (b[0] - a[0]) * t, a[1] + (b[1] - a[1]) * t))
+            next_at += spacing_m
+        travelled += leg
+    if samples[-1] != points[-1]:
+        samples.append(points[-1])
+    return samples
+
+
+def naive_ist(dt):
+    """Normalize a datetime to naive IST (how listings are stored)"""
+    if dt is None or not hasattr(dt, 'tzinfo'):
+        return None
+    if dt.tzinfo is not None:
+        dt = dt.astimezone(IST).replace(tzinfo=None)
+    return dt
+
+
+class GeoIndex:
+    """Uniform lon/lat grid of approved, available, non-expired listings
+
+    Each cell holds the ids of the listings whose coordinates fall inside it.
+    Radius queries only visit the cells overlapping the search circle, and
+    k-nearest queries expand ring by ring from the query cell.
+    """
+
+    def __init__(self, cell_size_deg=0.01):
+        self.cell_size = cell_size_deg  # ~1.1km at the equator
+        self.ready = False
+        self._lock = threading.RLock()
+        self._cells = {}
+        self._entries = {}
+
+    def _cell_for(self, lon, lat):
+        return (int(math.floor(lon / self.cell_size)), int(math.floor(lat / self.cell_size)))
+
+    @staticmethod
+    def is_eligible(parking):
+        """Whether a listing should be searchable at all"""
+        if not parking:
+            return False
+        if parking.get('status') != 'approved' or not parking.get('is_available'):
+            return False
+        coords = (parking.get('location') or {}).get('coordinates')
+        return bool(coords) and len(coords) == 2
+
+    def build(self, db):
+        """Load all live listings from parking_spaces"""
+        now = datetime.now(IST).replace(tzinfo=None)
+        docs = db.find_many(
+            'parking_spaces',
+            {'status': 'approved', 'is_available': True, 'available_to': {'$gte': now}},
+            projection=INDEX_PROJECTION
+        )
+        with self._lock:
+            self._cells = {}
+            self._entries = {}
+            for parking in docs:
+                self._upsert_locked(parking)
+            self.ready = True
+        print(f"✅ Geo index built with {len(self._entries)} listings")
+
+    def sync(self, parking_id, parking):
+        """Apply a listing's post-write state (None if it no longer exists)"""
+        if not self.ready:
+            return
+        if self.is_eligible(parking):
+            self.upsert(parking)
+        else:
+            self.remove(parking_id)
+
+    def upsert(self, parking):
+        with self._lock:
+            self._upsert_locked(parking)
+
+    def _upsert_locked(self, parking):
+        parking_id = str(parking['_id'])
+        self._remove_locked(parking_id)
+        if not self.is_eligible(parking):
+            return
+        lon, lat = (float(c) for c in parking['location']['coordinates'])
+        cell = self._cell_for(lon, lat)
+        self._entries[parking_id] = {
+            'lon': lon,
+            'lat': lat,
+            'cell': cell,
+            'available_to': naive_ist(parking.get('available_to')),
+            'vehicle_type': parking.get('vehicle_type'),
+            'price_per_hour': parking.get('price_per_hour', 0)
+        }
+        self._cells.setdefault(cell, set()).add(parking_id)
+
+    def remove(self, parking_id):
+        with self._lock:
+            self._remove_locked(str(parking_id))
+
+    def _remove_locked(self, parking_id):
+        entry = self._entries.pop(parking_id, None)
+        if entry is None:
+            return
+        bucket = self._cells.get(entry['cell'])
+        if bucket is not None:
+            bucket.discard(parking_id)
+            if not bucket:
+                del self._cells[entry['cell']]
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _live(self, entry, now):
+        return entry['available_to'] is None or entry['available_to'] >= now
+
+    def _cells_in(self, min_x, min_y, max_x, max_y):
+        """Cells to visit for a box of cells; caller holds the lock"""
+        # Large boxes: walking occupied cells beats walking the whole box
+        if (max_x - min_x + 1) * (max_y - min_y + 1) > len(self._cells):
+            return [c for c in self._cells if min_x <= c[0] <= max_x and min_y <= c[1] <= max_y]
+        return [(x, y) for x in range(min_x, max_x + 1) for y in range(min_y, max_y + 1)]
+
+    def within_radius(self, lon, lat, radius_m, limit=None):
+        """Return [(distance_m, parking_id)] inside radius_m, nearest first"""
+        lon, lat, radius_m = float(lon), float(lat), float(radius_m)
+        now = datetime.now(IST).replace(tzinfo=None)
+        dlat = radius_m / METERS_PER_DEGREE
+        dlon = radius_m / (METERS_PER_DEGREE * max(math.cos(math.radians(lat)), 0.01))
+        min_x, min_y = self._cell_for(lon - dlon, lat - dlat)
+        max_x, max_y = self._cell_for(lon + dlon, lat + dlat)
+
+        hits = []
+        with self._lock:
+            for cell in self._cells_in(min_x, min_y, max_x, max_y):
+                for parking_id in self._cells.get(cell, ()):
+                    entry = self._entries[parking_id]
+                    if not self._live(entry, now):
+                        continue
+                    distance = haversine_m(lon, lat, entry['lon'], entry['lat'])
+                    if distance <= radius_m:
+                        hits.append((distance, parking_id))
+        hits.sort()
+        return hits[:limit] if limit else hits
+
+    def within_bbox(self, min_lon, min_lat, max_lon, max_lat):
+        """Return [(parking_id, entry)] for live listings inside a lon/lat box"""
+        now = datetime.now(IST).replace(tzinfo=None)
+        min_x, min_y = self._cell_for(min_lon, min_lat)
+        max_x, max_y = self._cell_for(max_lon, max_lat)
+
+        hits = []
+        with self._lock:
+            for cell in self._cells_in(min_x, min_y, max_x, max_y):
+                for parking_id in self._cells.get(cell, ()):
+                    entry = self._entries[parking_id]
+                    if not self._live(entry, now):
+                        continue
+                    if min_lon <= entry['lon'] <= max_lon and min_lat <= entry['lat'] <= max_lat:
+                        hits.append((parking_id, dict(entry)))
+        return hits
+
+    def nearest(self, lon, lat, k, max_distance=None):
+        """Return the k nearest [(distance_m, parking_id)], optionally capped by distance"""
+        lon, lat = float(lon), float(lat)
+        now = datetime.now(IST).replace(tzinfo=None)
+        cx, cy = self._cell_for(lon, lat)
+        # Smallest distance covered by one ring step, in meters
+        ring_m = self.cell_size * METERS_PER_DEGREE * max(math.cos(math.radians(lat)), 0.01)
+
+        def collect(cells, hits):
+            for cell in cells:
+                for parking_id in self._cells.get(cell, ()):
+                    entry = self._entries[parking_id]
+                    if self._live(entry, now):
+                        hits.append((haversine_m(lon, lat, entry['lon'], entry['lat']), parking_id))
+
+        hits = []
+        with self._lock:
+            ring = 0
+            while True:
+                # Sparse index or distant query point: scanning occupied cells is cheaper
+                if 8 * ring >= len(self._cells):
+                    hits = []
+                    collect(list(self._cells), hits)
+                    break
+                if ring == 0:
+                    collect([(cx, cy)], hits)
+                else:
+                    perimeter = [(x, cy - ring) for x in range(cx - ring, cx + ring + 1)]
+                    perimeter += [(x, cy + ring) for x in range(cx - ring, cx + ring + 1)]
+                    perimeter += [(cx - ring, y) for y in range(cy - ring + 1, cy + ring)]
+                    perimeter += [(cx + ring, y) for y in range(cy - ring + 1, cy + ring)]
+                    collect(perimeter, hits)
+                # Anything in a further ring is at least ring * ring_m away
+                covered_m = ring * ring_m
+                if max_distance is not None and covered_m > max_distance:
+                    break
+                if len(hits) >= k and heapq.nsmallest(k, hits)[-1][0] <= covered_m:
+                    break
+                ring += 1
+
+        if max_distance is not None:
+            hits = [h for h in hits if h[0] <= max_distance]
+        return heapq.nsmallest(k, hits)
+
+
+# Global geo index instance
+geo_index = GeoIndex()
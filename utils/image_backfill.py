@@ -0,0 +1,155 @@
+"""
+Image Backfill Job
+Resumable walk over parking_spaces that moves embedded images into the
+blob store, dedupes them by hash and writes missing size variants
+"""
+import hashlib
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from pymongo import UpdateOne
+from models.image_blob import ImageBlob
+from utils.image_variants import image_variants, render_variants, VARIANT_MIMETYPE
+
+CHECKPOINT_ID = 'image-backfill'
+
+
+def decode_image(data_url):
+    """(sha256, content_type, bytes) for a data URL; runs in a worker process"""
+    data, content_type = ImageBlob.decode_data_url(data_url)
+    return hashlib.sha256(data).hexdigest(), content_type, data
+
+
+class ImageBackfill:
+    """One backfill run; progress is checkpointed after every batch
+
+    The checkpoint (last processed _id plus running totals) lives in
+    maintenance_checkpoints, so an interrupted run resumes where it
+    stopped. Decoding and re-encoding happen in a process pool; blob
+    writes and the per-batch bulk_write happen here.
+    """
+
+    def __init__(self, db, batch_size=50, workers=2, variants=True):
+        self.db = db
+        self.batch_size = batch_size
+        self.workers = workers
+        self.variants = variants and image_variants.available
+        self.checkpoints = db.get_collection('maintenance_checkpoints')
+        self._seen = {}
+
+    def _new_report(self):
+        return {
+            'listings_scanned': 0,
+            'listings_updated': 0,
+            'images_extracted': 0,
+            'duplicates': 0,
+            'variants_written': 0,
+            'failed': 0,
+            'embedded_bytes_removed': 0,
+            'blob_bytes_written': 0,
+            'variant_bytes_written': 0,
+            'card_bytes_saved': 0
+        }
+
+    def run(self, restart=False, log=print):
+        """Process every listing after the checkpoint; returns the report"""
+        checkpoint = None if restart else self.checkpoints.find_one({'_id': CHECKPOINT_ID})
+        last_id = (checkpoint or {}).get('last_id')
+        report = dict(self._new_report(), **((checkpoint or {}).get('report') or {}))
+        if last_id:
+            log(f"↪️  Resuming after {last_id}")
+
+        collection = self.db.get_collection('parking_spaces')
+        with ProcessPoolExecutor(max_workers=self.workers) as pool:
+            while True:
+                query = {'_id': {'$gt': last_id}} if last_id else {}
+                docs = list(collection.find(query, {'images': 1}).sort('_id', 1).limit(self.batch_size))
+                if not docs:
+                    break
+
+                operations = self._process_batch(pool, docs, report)
+                if operations:
+                    report['listings_updated'] += collection.bulk_write(operations, ordered=False).modified_count
+                report['listings_scanned'] += len(docs)
+                last_id = docs[-1]['_id']
+                self.checkpoints.update_one(
+                    {'_id': CHECKPOINT_ID},
+                    {'$set': {'last_id': last_id, 'report': report, 'updated_at': datetime.utcnow()}},
+                    upsert=True
+                )
+                log(f"… {report['listings_scanned']} listings scanned, {report['images_extracted']} images extracted")
+
+        report['bytes_saved'] = report['embedded_bytes_removed'] - report['blob_bytes_written']
+        return report
+
+    def _process_batch(self, pool, docs, report):
+        # Phase 1: decode new data URLs in the pool (identical strings once)
+        pending = {}
+        for doc in docs:
+            for image in doc.get('images') or []:
+                if isinstance(image, str) and image.startswith('data:'):
+                    key = hashlib.sha1(image.encode('utf-8')).digest()
+                    if key not in self._seen and key not in pending:
+                        pending[key] = pool.submit(decode_image, image)
+
+        to_encode = {}
+        for key, future in pending.items():
+            try:
+                image_hash, content_type, data = future.result()
+            except Exception as e:
+                print(f"⚠️  Could not decode embedded image: {e}")
+                report['failed'] += 1
+                continue
+            self._seen[key] = image_hash
+            blob = ImageBlob.get(self.db, image_hash)
+            if blob:
+                report['duplicates'] += 1
+            else:
+                ImageBlob.put(self.db, data, content_type)
+                report['blob_bytes_written'] += len(data)
+            if self.variants and not (blob or {}).get('variants'):
+                to_encode[image_hash] = data
+
+        # Blobs stored earlier without variants are re-encoded too
+        if self.variants:
+            for doc in docs:
+                for image in doc.get('images') or []:
+                    if ImageBlob.is_hash(image) and image not in to_encode:
+                        blob = ImageBlob.get(self.db, image)
+                        if blob and not blob.get('variants'):
+                            to_encode[image] = b''.join(ImageBlob.iter_bytes(self.db, image))
+
+        # Phase 2: encode variants in the pool
+        encoding = {h: pool.submit(render_variants, data) for h, data in to_encode.items()}
+        for image_hash, future in encoding.items():
+            try:
+                rendered = future.result()
+            except Exception as e:
+                print(f"⚠️  Could not re-encode {image_hash}: {e}")
+                report['failed'] += 1
+                continue
+            variants = {}
+            for name, encoded in rendered.items():
+                if not ImageBlob.get(self.db, hashlib.sha256(encoded).hexdigest()):
+                    report['variant_bytes_written'] += len(encoded)
+                variants[name] = ImageBlob.put(self.db, encoded, VARIANT_MIMETYPE)
+            ImageBlob.set_variants(self.db, image_hash, variants)
+            report['variants_written'] += 1
+            report['card_bytes_saved'] += max(0, len(to_encode[image_hash]) - len(rendered['card']))
+
+        # Rewrite each listing's images with hashes
+        operations = []
+        for doc in docs:
+            images = doc.get('images') or []
+            rewritten = []
+            for image in images:
+                if isinstance(image, str) and image.startswith('data:'):
+                    image_hash = self._seen.get(hashlib.sha1(image.encode('utf-8')).digest())
+                    if image_hash:
+                        report['images_extracted'] += 1
+                        report['embedded_bytes_removed'] += len(image)
+                        rewritten.append(image_hash)
+                        continue
+                rewritten.append(ImageBlob.hash_from_url(image) or image)
+            if rewritten != images:
+                operations.append(UpdateOne({'_id': doc['_id']}, {'$set': {'images': rewritten}}))
+        return operations
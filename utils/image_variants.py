@@ -0,0 +1,128 @@
+"""
+Image Variant Pipeline
+Pre-sized WebP renditions (thumb, card, full) of uploaded listing images,
+encoded in a process pool off the request thread
+"""
+import io
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+try:
+    from PIL import Image, ImageOps
+except ImportError:  # Pillow is optional; originals are served unchanged without it
+    Image = None
+
+# Longest edge in pixels and WebP quality per variant
+VARIANTS = {
+    'thumb': (160, 70),
+    'card': (480, 78),
+    'full': (1600, 82)
+}
+VARIANT_MIMETYPE = 'image/webp'
+
+
+def render_variants(source):
+    """{name: webp bytes} for image bytes or a file path; runs in a worker process"""
+    with Image.open(source if isinstance(source, str) else io.BytesIO(source)) as source:
+        source = ImageOps.exif_transpose(source)
+        if source.mode not in ('RGB', 'RGBA'):
+            source = source.convert('RGBA' if 'transparency' in source.info else 'RGB')
+        rendered = {}
+        for name, (edge, quality) in VARIANTS.items():
+            image = source.copy()
+            # thumbnail() never upscales, so small uploads keep their size
+            image.thumbnail((edge, edge), Image.LANCZOS)
+            out = io.BytesIO()
+            image.save(out, format='WEBP', quality=quality, method=4)
+            rendered[name] = out.getvalue()
+        return rendered
+
+
+class VariantPipeline:
+    """Schedules variant encoding and records the results on the blob
+
+    Encoding runs in a small process pool; a completion callback stores each
+    variant as its own blob and links it from the original's metadata.
+    Until that happens (or when Pillow is missing) the original is served.
+    """
+
+    def __init__(self, max_workers=2):
+        self.max_workers = max_workers
+        self._lock = threading.Lock()
+        self._pool = None
+        self.scheduled = 0
+        self.completed = 0
+        self.failed = 0
+
+    @property
+    def available(self):
+        return Image is not None
+
+    def configure(self, max_workers=None):
+        if max_workers is not None:
+            self.max_workers = int(max_workers)
+
+    def _executor(self):
+        with self._lock:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(max_workers=self.max_workers)
+            return self._pool
+
+    def schedule(self, db, image_hash, source):
+        """Queue variant generation for a stored blob; returns False if unavailable
+
+        source is the image as bytes or as a seekable file object; file
+        objects are handed to the worker through a temporary file on disk
+        so the request never holds the whole image in memory.
+        """
+        if not self.available:
+            return False
+        from models.image_blob import ImageBlob
+        from utils.upload import copy_to_tempfile
+
+        # Re-uploads of an already processed image reuse its variants
+        if (ImageBlob.get(db, image_hash) or {}).get('variants'):
+            return True
+
+        temp_path = None
+        if hasattr(source, 'read'):
+            source = temp_path = copy_to_tempfile(source)
+
+        future = self._executor().submit(render_variants, source)
+        with self._lock:
+            self.scheduled += 1
+
+        def store(done):
+            try:
+                variants = {
+                    name: ImageBlob.put(db, encoded, VARIANT_MIMETYPE)
+                    for name, encoded in done.result().items()
+                }
+                ImageBlob.set_variants(db, image_hash, variants)
+                with self._lock:
+                    self.completed += 1
+            except Exception as e:
+                print(f"⚠️  Image variant generation failed for {image_hash}: {e}")
+                with self._lock:
+                    self.failed += 1
+            finally:
+                if temp_path:
+                    os.unlink(temp_path)
+
+        future.add_done_callback(store)
+        return True
+
+    def stats(self):
+        with self._lock:
+            return {
+                'available': self.available,
+                'max_workers': self.max_workers,
+                'scheduled': self.scheduled,
+                'completed': self.completed,
+                'failed': self.failed
+            }
+
+
+# Global variant pipeline instance
+image_variants = VariantPipeline()
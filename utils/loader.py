@@ -0,0 +1,117 @@
+"""
+Request-Scoped Entity Loader
+Batches related-document lookups (owners, renters, listings) into one
+$in query per collection and keeps an identity map for the request
+"""
+from itertools import islice
+from bson.objectid import ObjectId
+from flask import g
+
+# Rows handled per batch when related documents are loaded for a stream
+LOAD_BATCH = 100
+
+# Fields the routes embed for a related user
+USER_SUMMARY_PROJECTION = {
+    'name': 1,
+    'email': 1,
+    'phone': 1,
+    'role': 1,
+    'profile_image': 1
+}
+
+
+def _object_id(value):
+    if isinstance(value, ObjectId):
+        return value
+    try:
+        return ObjectId(str(value))
+    except Exception:
+        return None
+
+
+class EntityBatch:
+    """Documents of one collection under one projection
+
+    prime() only records ids; the first get() afterwards resolves every
+    pending id with a single $in query. Resolved documents (and ids that
+    matched nothing) stay in the identity map, so an owner shared by many
+    rows is fetched once per request.
+    """
+
+    def __init__(self, loader, collection, projection=None):
+        self.loader = loader
+        self.collection = collection
+        self.projection = projection
+        self._docs = {}
+        self._pending = set()
+
+    def prime(self, ids):
+        for value in ids:
+            oid = _object_id(value)
+            if oid is not None and oid not in self._docs:
+                self._pending.add(oid)
+        return self
+
+    def _flush(self):
+        if not self._pending:
+            return
+        ids = list(self._pending)
+        self._pending.clear()
+        docs = self.loader.db.find_many(self.collection, {'_id': {'$in': ids}}, projection=self.projection)
+        self.loader.queries += 1
+        for oid in ids:
+            self._docs[oid] = None
+        for doc in docs:
+            self._docs[doc['_id']] = doc
+
+    def get(self, value):
+        """Document for an id, or None if it is invalid or does not exist"""
+        oid = _object_id(value)
+        if oid is None:
+            return None
+        if oid not in self._docs:
+            self._pending.add(oid)
+        self._flush()
+        return self._docs.get(oid)
+
+
+class EntityLoader:
+    """Per-request registry of EntityBatch instances"""
+
+    def __init__(self, db):
+        self.db = db
+        self.queries = 0
+        self._batches = {}
+
+    def batch(self, collection, projection=None):
+        # Projections may hold expressions (dicts), so key on their repr
+        key = (collection, repr(sorted(projection.items())) if projection else None)
+        if key not in self._batches:
+            self._batches[key] = EntityBatch(self, collection, projection)
+        return self._batches[key]
+
+    @property
+    def users(self):
+        return self.batch('users', USER_SUMMARY_PROJECTION)
+
+    def parking(self, projection=None):
+        return self.batch('parking_spaces', projection)
+
+
+def get_loader():
+    """The loader for the current request, created on first use"""
+    loader = g.get('entity_loader')
+    if loader is None:
+        from models.database import db
+        loader = g.entity_loader = EntityLoader(db)
+    return loader
+
+
+def chunked(rows, size=LOAD_BATCH):
+    """Yield lists of up to size rows; lets lazy cursors prime related ids per batch"""
+    rows = iter(rows)
+    while True:
+        chunk = list(islice(rows, size))
+        if not chunk:
+            return
+        yield chunk
@@ -0,0 +1,54 @@
+"""
+Locality Token Utility
+Normalizes addresses/cities into indexable tokens for city search
+"""
+import re
+import unicodedata
+
+_NON_ALNUM = re.compile(r'[^a-z0-9]+')
+
+# Stored on listings as locality_version; bump when the token format changes
+# so backfill-locality-tokens (also run at startup) rewrites older listings
+LOCALITY_TOKENS_VERSION = 2
+
+
+def normalize_locality(text):
+    """Lowercase, strip accents and punctuation, collapse whitespace"""
+    if not text:
+        return ''
+    text = unicodedata.normalize('NFKD', str(text)).encode('ascii', 'ignore').decode('ascii')
+    return _NON_ALNUM.sub(' ', text.lower()).strip()
+
+
+def locality_tokens(address, city=None):
+    """Build the locality_tokens list stored on a listing
+
+    Every comma-separated part of the address (and the city) is kept as a
+    phrase starting at each of its words ("12 mg road", "mg road", "road")
+    plus its single words, so a multi-word query like "MG Road" still
+    prefix-matches past a house number through the multikey index.
+    """
+    tokens = []
+    seen = set()
+    parts = str(address or '').split(',')
+    if city:
+        parts.append(str(city))
+    for part in parts:
+        phrase = normalize_locality(part)
+        if not phrase:
+            continue
+        words = phrase.split(' ')
+        for token in [' '.join(words[i:]) for i in range(len(words))] + words:
+            if len(token) > 1 and token not in seen:
+                seen.add(token)
+                tokens.append(token)
+    return tokens
+
+
+def locality_query(city):
+    """Mongo filter matching listings whose tokens start with the normalized city"""
+    normalized = normalize_locality(city)
+    if not normalized:
+        return None
+    # Anchored, case-sensitive regex is served by the locality_tokens index
+    return {'locality_tokens': {'$regex': '^' + re.escape(normalized)}}
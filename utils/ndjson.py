@@ -0,0 +1,28 @@
+"""
+NDJSON Streaming Utility
+Newline-delimited JSON responses for large list endpoints
+"""
+from flask import Response, current_app, request, stream_with_context
+
+NDJSON_MIMETYPE = 'application/x-ndjson'
+
+
+def wants_ndjson():
+    """Whether the client explicitly prefers NDJSON over JSON"""
+    accept = request.accept_mimetypes
+    # A wildcard Accept rates both equally and keeps the regular JSON response
+    return accept[NDJSON_MIMETYPE] > accept['application/json']
+
+
+def ndjson_response(rows, headers=None):
+    """Stream an iterable of dicts as one JSON document per line
+
+    Rows are serialized as they are pulled, so a lazy source such as a
+    Mongo cursor is never held in memory as a whole.
+    """
+    def generate():
+        dumps = current_app.json.dumps
+        for row in rows:
+            yield dumps(row) + '\n'
+
+    return Response(stream_with_context(generate()), mimetype=NDJSON_MIMETYPE, headers=headers)
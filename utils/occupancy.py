@@ -0,0 +1,141 @@
+"""
+Booking Occupancy Index
+Hour-bucket counters of booked spots per parking space, used to hide
+listings that are fully booked for a requested time window
+"""
+import math
+import threading
+from datetime import datetime, timezone
+from bson.objectid import ObjectId
+
+# Bookings in these statuses hold their spots
+HOLDING_STATUSES = ['pending', 'confirmed', 'active']
+
+SECONDS_PER_HOUR = 3600
+
+
+def epoch_hours(dt):
+    """Hours since the Unix epoch as a float
+
+    Aware datetimes are converted exactly. Naive datetimes are what pymongo
+    returns for stored booking times, which are UTC.
+    """
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return dt.timestamp() / SECONDS_PER_HOUR
+
+
+def hour_span(start, end):
+    """Hour buckets touched by [start, end); partial hours count as whole"""
+    first = int(math.floor(epoch_hours(start)))
+    last = int(math.ceil(epoch_hours(end)))
+    return range(first, max(last, first + 1))
+
+
+class OccupancyIndex:
+    """Booked spots per (parking space, hour)
+
+    Each parking space maps hour buckets to the number of spots held by
+    pending/confirmed/active bookings. Checking a window reads one counter
+    per hour in the window, so the cost depends on the window length and
+    not on how many bookings the space has.
+    """
+
+    def __init__(self):
+        self.ready = False
+        self._lock = threading.Lock()
+        self._buckets = {}
+        self._bookings = {}
+
+    def build(self, db):
+        """Load bookings that still hold spots"""
+        now = datetime.utcnow()
+        bookings = db.find_many(
+            'bookings',
+            {'status': {'$in': HOLDING_STATUSES}, 'end_time': {'$gte': now}},
+            projection={'parking_id': 1, 'start_time': 1, 'end_time': 1, 'number_of_spots': 1}
+        )
+        with self._lock:
+            self._buckets = {}
+            self._bookings = {}
+            for booking in bookings:
+                self._add_locked(booking)
+            self.ready = True
+        print(f"✅ Occupancy index built with {len(self._bookings)} bookings")
+
+    def add_booking(self, booking):
+        with self._lock:
+            self._add_locked(booking)
+
+    def _add_locked(self, booking):
+        booking_id = str(booking['_id'])
+        if booking_id in self._bookings:
+            return
+        parking_id = str(booking['parking_id'])
+        spots = int(booking.get('number_of_spots', 1))
+        hours = hour_span(booking['start_time'], booking['end_time'])
+        buckets = self._buckets.setdefault(parking_id, {})
+        for hour in hours:
+            buckets[hour] = buckets.get(hour, 0) + spots
+        self._bookings[booking_id] = (parking_id, hours, spots)
+
+    def remove_booking(self, booking_id):
+        with self._lock:
+            held = self._bookings.pop(str(booking_id), None)
+            if held is None:
+                return
+            parking_id, hours, spots = held
+            buckets = self._buckets.get(parking_id, {})
+            for hour in hours:
+                remaining = buckets.get(hour, 0) - spots
+                if remaining > 0:
+                    buckets[hour] = remaining
+                else:
+                    buckets.pop(hour, None)
+            if not buckets:
+                self._buckets.pop(parking_id, None)
+
+    def peak(self, parking_id, start, end):
+        """Most spots held in any hour of [start, end)"""
+        with self._lock:
+            buckets = self._buckets.get(str(parking_id))
+            if not buckets:
+                return 0
+            return max((buckets.get(hour, 0) for hour in hour_span(start, end)), default=0)
+
+    def peaks(self, db, parking_ids, start, end):
+        """Peak held spots per parking id for a window
+
+        Served from memory when the index is warm; otherwise one query over
+        the overlapping bookings of just these parking spaces.
+        """
+        parking_ids = [str(pid) for pid in parking_ids]
+        if self.ready:
+            return {pid: self.peak(pid, start, end) for pid in parking_ids}
+
+        overlapping = db.find_many(
+            'bookings',
+            {
+                'parking_id': {'$in': [ObjectId(pid) for pid in parking_ids]},
+                'status': {'$in': HOLDING_STATUSES},
+                'start_time': {'$lt': end},
+                'end_time': {'$gt': start}
+            },
+            projection={'parking_id': 1, 'start_time': 1, 'end_time': 1, 'number_of_spots': 1}
+        )
+        scratch = OccupancyIndex()
+        for booking in overlapping:
+            scratch._add_locked(booking)
+        return {pid: scratch.peak(pid, start, end) for pid in parking_ids}
+
+    def stats(self):
+        with self._lock:
+            return {
+                'ready': self.ready,
+                'bookings': len(self._bookings),
+                'parking_spaces': len(self._buckets)
+            }
+
+
+# Global occupancy index instance
+occupancy_index = OccupancyIndex()
@@ -0,0 +1,176 @@
+"""
+Search Relevance Scoring
+Blends distance, price, rating, availability and popularity into one score
+"""
+import heapq
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+import pytz
+
+IST = pytz.timezone('Asia/Kolkata')
+
+DEFAULT_WEIGHTS = {
+    'distance': 0.35,
+    'price': 0.2,
+    'rating': 0.2,
+    'availability': 0.15,
+    'popularity': 0.1
+}
+
+
+class RelevanceScorer:
+    """Scores candidate listings in [0, 1]
+
+    Components, each in [0, 1]:
+      distance      1 at the search point, 0 at the radius (geo searches only)
+      price         median / (median + price), 0.5 at the candidates' median
+      rating        rating shrunk toward prior_rating by prior_reviews
+      availability  free-space ratio times remaining time over horizon_hours
+      popularity    bookings / (bookings + popularity_half)
+    The score is the weighted mean of the components that apply. It is
+    computed by aggregation stages (score_stages), so only (_id, score,
+    distance) rows leave Mongo.
+
+    Scores depend on the clock and on the candidates' median price, so a
+    filter set's scored list is kept for ttl_seconds and reused by its
+    later pages; that keeps (score, _id) cursors stable. A first page
+    (no cursor) always re-scores.
+    """
+
+    def __init__(self, weights=None, prior_rating=3.0, prior_reviews=5,
+                 horizon_hours=12, popularity_half=10,
+                 max_candidates=2000, ttl_seconds=300, max_entries=256):
+        self.weights = dict(weights or DEFAULT_WEIGHTS)
+        self.prior_rating = prior_rating
+        self.prior_reviews = prior_reviews
+        self.horizon_hours = horizon_hours
+        self.popularity_half = popularity_half
+        self.max_candidates = max_candidates
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._ranked = OrderedDict()
+
+    def configure(self, weights=None, max_candidates=None, ttl_seconds=None):
+        if weights:
+            self.weights = dict(DEFAULT_WEIGHTS, **weights)
+        if max_candidates is not None:
+            self.max_candidates = int(max_candidates)
+        if ttl_seconds is not None:
+            self.ttl_seconds = float(ttl_seconds)
+
+    def ranked(self, key, compute, reuse=True):
+        """Scored list for a filter key, from compute() unless a fresh one is kept"""
+        now = time.monotonic()
+        if reuse:
+            with self._lock:
+                entry = self._ranked.get(key)
+                if entry and entry[0] > now:
+                    self._ranked.move_to_end(key)
+                    return entry[1]
+        scored = compute()
+        with self._lock:
+            self._ranked[key] = (now + self.ttl_seconds, scored)
+            self._ranked.move_to_end(key)
+            while len(self._ranked) > self.max_entries:
+                self._ranked.popitem(last=False)
+        return scored
+
+    def score_stages(self, radius_m=None):
+        """Aggregation stages scoring candidate listings into {_id, score, distance}
+
+        Candidates are listing documents, with 'distance' in meters for
+        geo searches (radius_m set). The candidates' median price
+        is taken in the pipeline: they are grouped in price order and the
+        middle element is read back onto every row.
+        """
+        now = datetime.now(IST).replace(tzinfo=None)
+        w = self.weights
+        total_weight = sum(w.values()) - (0 if radius_m else w.get('distance', 0))
+        if total_weight <= 0:
+            total_weight = 1
+
+        def number(field):
+            return {'$ifNull': [f'${field}', 0]}
+
+        def clamp(expr):
+            return {'$min': [1.0, {'$max': [0.0, expr]}]}
+
+        size = {'$size': '$rows'}
+        middle = {'$floor': {'$divide': [size, 2]}}
+        median = {'$cond': [
+            {'$eq': [{'$mod': [size, 2]}, 1]},
+            {'$arrayElemAt': ['$rows.price', middle]},
+            {'$avg': [
+                {'$arrayElemAt': ['$rows.price', {'$subtract': [middle, 1]}]},
+                {'$arrayElemAt': ['$rows.price', middle]}
+            ]}
+        ]}
+
+        # After the $unwind each row sits under 'rows', next to the median
+        price, rating, reviews = '$rows.price', '$rows.rating', '$rows.reviews'
+        bookings = '$rows.bookings'
+        shrunk = {'$divide': [
+            {'$add': [{'$multiply': [rating, reviews]}, self.prior_rating * self.prior_reviews]},
+            {'$add': [reviews, self.prior_reviews]}
+        ]}
+        # A listing without available_to counts as expiring now
+        remaining_hours = {'$divide': [
+            {'$subtract': [{'$ifNull': ['$rows.available_to', now]}, now]},
+            3600 * 1000
+        ]}
+        components = {
+            'price': {'$cond': [
+                {'$gt': [{'$add': ['$median', price]}, 0]},
+                {'$divide': ['$median', {'$add': ['$median', price]}]},
+                1.0
+            ]},
+            'rating': {'$divide': [shrunk, 5]},
+            'availability': {'$multiply': [
+                {'$min': [1.0, {'$divide': ['$rows.free', '$rows.total_spaces']}]},
+                clamp({'$divide': [remaining_hours, self.horizon_hours]})
+            ]},
+            'popularity': {'$divide': [bookings, {'$add': [bookings, self.popularity_half]}]}
+        }
+        if radius_m:
+            components['distance'] = clamp({'$subtract': [1, {'$divide': ['$rows.distance', float(radius_m)]}]})
+        terms = [
+            {'$multiply': [w[name], expr]}
+            for name, expr in components.items() if w.get(name)
+        ]
+
+        return [
+            {'$project': {
+                'distance': 1,
+                'available_to': 1,
+                'price': number('price_per_hour'),
+                'rating': number('rating'),
+                'reviews': number('total_reviews'),
+                'free': number('available_spaces'),
+                'total_spaces': {'$cond': [{'$gt': [number('total_spaces'), 0]}, number('total_spaces'), 1.0]},
+                'bookings': number('total_bookings')
+            }},
+            {'$sort': {'price': 1}},
+            {'$group': {'_id': None, 'rows': {'$push': '$$ROOT'}}},
+            {'$addFields': {'median': median}},
+            {'$unwind': '$rows'},
+            {'$project': {
+                '_id': '$rows._id',
+                'distance': '$rows.distance',
+                'score': {'$divide': [{'$add': terms or [0]}, total_weight]}
+            }}
+        ]
+
+    @staticmethod
+    def top(scored, k, after=None):
+        """k best (score, _id, distance) rows strictly after a (score, _id) cursor"""
+        if after:
+            bound = (after[0], after[1])
+            scored = [s for s in scored if (s[0], s[1]) < bound]
+        return heapq.nlargest(k, scored, key=lambda s: (s[0], s[1]))
+
+
+# Global relevance scorer instance
+relevance_scorer = RelevanceScorer()
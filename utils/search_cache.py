@@ -0,0 +1,170 @@
+"""
+Search Result Cache
+Bounded LRU/TTL cache of serialized /api/parking/search responses with
+event-driven invalidation on listing writes
+"""
+import math
+import threading
+import time
+from collections import OrderedDict
+from utils.locality import normalize_locality
+from utils.geo_index import GeoIndex
+
+# Coarse cells (~11km) used to scope geo searches for invalidation
+SCOPE_CELL_DEG = 0.1
+METERS_PER_DEGREE = 111320
+
+# Filters that are part of the cache key
+KEY_FIELDS = ('city', 'latitude', 'longitude', 'radius', 'vehicle_type',
+              'max_price', 'start_time', 'end_time', 'limit', 'sort', 'cursor', 'view')
+
+
+def _scope_cell(lon, lat):
+    return (int(math.floor(lon / SCOPE_CELL_DEG)), int(math.floor(lat / SCOPE_CELL_DEG)))
+
+
+class SearchCache:
+    """LRU + TTL cache keyed on the normalized search filter set
+
+    Every entry remembers which listings it contains and which area it
+    covers (city prefix and/or coarse geo cells). When a listing changes,
+    only entries that contained it or whose area now includes it are
+    dropped. Searches with no area filter are dropped on any change.
+    """
+
+    def __init__(self, max_entries=512, ttl_seconds=60):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._by_listing = {}
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def configure(self, max_entries=None, ttl_seconds=None):
+        if max_entries is not None:
+            self.max_entries = int(max_entries)
+        if ttl_seconds is not None:
+            self.ttl_seconds = float(ttl_seconds)
+
+    @staticmethod
+    def make_key(filters):
+        """Normalize a filter dict into a hashable cache key"""
+        key = []
+        for field in KEY_FIELDS:
+            value = filters.get(field)
+            if value in (None, ''):
+                continue
+            if field == 'city':
+                value = normalize_locality(value)
+            elif field in ('latitude', 'longitude'):
+                value = round(float(value), 5)
+            elif field in ('radius', 'max_price'):
+                value = float(value)
+            key.append((field, value))
+        return tuple(key)
+
+    @staticmethod
+    def _scope_for(filters):
+        """Area covered by a search: (city prefix or None, set of cells or None)"""
+        city = normalize_locality(filters.get('city')) or None
+        cells = None
+        if filters.get('latitude') and filters.get('longitude'):
+            lon, lat = float(filters['longitude']), float(filters['latitude'])
+            radius = float(filters.get('radius') or 5000)
+            dlat = radius / METERS_PER_DEGREE
+            dlon = radius / (METERS_PER_DEGREE * max(math.cos(math.radians(lat)), 0.01))
+            min_x, min_y = _scope_cell(lon - dlon, lat - dlat)
+            max_x, max_y = _scope_cell(lon + dlon, lat + dlat)
+            cells = {(x, y) for x in range(min_x, max_x + 1) for y in range(min_y, max_y + 1)}
+        return city, cells
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry['expires_at'] < time.monotonic():
+                if entry is not None:
+                    self._drop_locked(key)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry['value']
+
+    def put(self, key, filters, value, listing_ids):
+        city, cells = self._scope_for(filters)
+        listing_ids = {str(pid) for pid in listing_ids}
+        with self._lock:
+            self._drop_locked(key)
+            self._entries[key] = {
+                'value': value,
+                'expires_at': time.monotonic() + self.ttl_seconds,
+                'city': city,
+                'cells': cells,
+                'listing_ids': listing_ids
+            }
+            for pid in listing_ids:
+                self._by_listing.setdefault(pid, set()).add(key)
+            while len(self._entries) > self.max_entries:
+                self._drop_locked(next(iter(self._entries)))
+
+    def _drop_locked(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        for pid in entry['listing_ids']:
+            keys = self._by_listing.get(pid)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._by_listing[pid]
+
+    def invalidate_listing(self, parking_id, parking):
+        """Drop entries affected by a write to one listing
+
+        parking is the listing's post-write document (may be None).
+        """
+        tokens = (parking or {}).get('locality_tokens') or []
+        coords = ((parking or {}).get('location') or {}).get('coordinates')
+        cell = _scope_cell(float(coords[0]), float(coords[1])) if coords and len(coords) == 2 else None
+
+        with self._lock:
+            stale = set(self._by_listing.get(str(parking_id), ()))
+            # A listing that is not searchable can only leave results, never join them
+            candidates = self._entries.items() if GeoIndex.is_eligible(parking) else ()
+            for key, entry in candidates:
+                if key in stale:
+                    continue
+                city, cells = entry['city'], entry['cells']
+                if city is None and cells is None:
+                    stale.add(key)
+                elif city is not None and any(t.startswith(city) for t in tokens):
+                    stale.add(key)
+                elif cells is not None and cell in cells:
+                    stale.add(key)
+            for key in stale:
+                self._drop_locked(key)
+            self.invalidations += len(stale)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._by_listing.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'ttl_seconds': self.ttl_seconds,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0,
+                'invalidations': self.invalidations
+            }
+
+
+# Global search cache instance
+search_cache = SearchCache()
@@ -0,0 +1,186 @@
+"""
+Hot-area Search Snapshots
+Precomputed, serialized default search responses for the busiest
+city/vehicle_type combinations, rebuilt by a background thread
+"""
+import json
+import threading
+import time
+from collections import Counter
+from utils.locality import normalize_locality
+from utils.geo_index import GeoIndex
+
+# Snapshots hold the default page a city search returns
+SNAPSHOT_LIMIT = 50
+
+
+def snapshot_key(filters):
+    """(city, vehicle_type) for a default-shaped city search, else None
+
+    Only searches narrowed by nothing but city and vehicle type, on the
+    default sort, card view and page size, are served from snapshots.
+    """
+    city = normalize_locality(filters.get('city'))
+    if not city:
+        return None
+    for field in ('latitude', 'longitude', 'max_price', 'start_time', 'end_time', 'cursor'):
+        if filters.get(field):
+            return None
+    if filters.get('sort') not in (None, '', 'newest'):
+        return None
+    if filters.get('view', 'card') != 'card' or int(filters.get('limit') or SNAPSHOT_LIMIT) != SNAPSHOT_LIMIT:
+        return None
+    return city, filters.get('vehicle_type') or ''
+
+
+class SearchSnapshots:
+    """Serialized responses for the top-K most requested default searches
+
+    Requests are counted per (city, vehicle_type). Every refresh cycle the
+    background thread keeps the top_k keys, rebuilds snapshots that are
+    missing, invalidated or older than refresh_seconds, and halves the
+    counters so the hot set follows recent traffic. A listing write drops
+    affected snapshots at once and wakes the thread to rebuild them.
+    """
+
+    def __init__(self, top_k=32, refresh_seconds=60):
+        self.top_k = top_k
+        self.refresh_seconds = refresh_seconds
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread = None
+        self._builder = None
+        self._demand = Counter()
+        self._snapshots = {}
+        self._versions = {}
+        self._building = set()
+        self.hits = 0
+        self.misses = 0
+        self.builds = 0
+
+    def configure(self, top_k=None, refresh_seconds=None):
+        if top_k is not None:
+            self.top_k = int(top_k)
+        if refresh_seconds is not None:
+            self.refresh_seconds = float(refresh_seconds)
+
+    def start(self, builder):
+        """Start the refresh thread; builder(filters) returns a search response dict"""
+        self._builder = builder
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._thread = threading.Thread(target=self._run, name='search-snapshots', daemon=True)
+        self._thread.start()
+        print("✅ Search snapshot refresher started")
+
+    def _run(self):
+        while True:
+            self._wake.wait(self.refresh_seconds)
+            self._wake.clear()
+            try:
+                self.refresh()
+            except Exception as e:
+                print(f"⚠️  Search snapshot refresh failed: {e}")
+
+    def get(self, filters):
+        """Serialized JSON body for a default search, or None"""
+        key = snapshot_key(filters)
+        if key is None:
+            return None
+        with self._lock:
+            self._demand[key] += 1
+            snapshot = self._snapshots.get(key)
+            if snapshot is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            return snapshot['body']
+
+    def refresh(self):
+        """Rebuild missing or stale snapshots for the current top-K keys"""
+        if self._builder is None:
+            return
+        now = time.monotonic()
+        with self._lock:
+            hot = [key for key, _ in self._demand.most_common(self.top_k)]
+            for key in list(self._snapshots):
+                if key not in hot:
+                    del self._snapshots[key]
+            for key in list(self._demand):
+                self._demand[key] //= 2
+                if not self._demand[key]:
+                    del self._demand[key]
+            due = [
+                (key, self._versions.get(key, 0)) for key in hot
+                if key not in self._snapshots or now - self._snapshots[key]['built_at'] >= self.refresh_seconds
+            ]
+            self._building = {key for key, _ in due}
+
+        for key, version in due:
+            city, vehicle_type = key
+            try:
+                response = self._builder({
+                    'city': city,
+                    'vehicle_type': vehicle_type or None,
+                    'radius': 5000,
+                    'limit': SNAPSHOT_LIMIT,
+                    'view': 'card'
+                })
+                snapshot = {
+                    'body': json.dumps(response, separators=(',', ':')),
+                    'listing_ids': {row['id'] for row in response['parking_spaces']},
+                    'built_at': time.monotonic()
+                }
+            except Exception as e:
+                print(f"⚠️  Search snapshot build failed for {key}: {e}")
+                snapshot = None
+            with self._lock:
+                # A write that landed mid-build makes this result stale already
+                if snapshot is not None and self._versions.get(key, 0) == version:
+                    self._snapshots[key] = snapshot
+                    self.builds += 1
+                self._building.discard(key)
+
+    def invalidate_listing(self, parking_id, parking):
+        """Drop snapshots a write to one listing could change"""
+        parking_id = str(parking_id)
+        tokens = (parking or {}).get('locality_tokens') or []
+        eligible = GeoIndex.is_eligible(parking)
+        with self._lock:
+            stale = [
+                key for key, snapshot in self._snapshots.items()
+                if parking_id in snapshot['listing_ids']
+                or (eligible and any(t.startswith(key[0]) for t in tokens))
+            ]
+            for key in stale:
+                del self._snapshots[key]
+            # In-flight builds may already have read the old listing state
+            bumped = set(stale) | self._building
+            for key in bumped:
+                self._versions[key] = self._versions.get(key, 0) + 1
+        if bumped:
+            self._wake.set()
+
+    def clear(self):
+        with self._lock:
+            for key in set(self._snapshots) | self._building:
+                self._versions[key] = self._versions.get(key, 0) + 1
+            self._snapshots.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'snapshots': len(self._snapshots),
+                'top_k': self.top_k,
+                'refresh_seconds': self.refresh_seconds,
+                'tracked_keys': len(self._demand),
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0,
+                'builds': self.builds
+            }
+
+
+# Global search snapshot instance
+search_snapshots = SearchSnapshots()
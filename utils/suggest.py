@@ -0,0 +1,142 @@
+"""
+Locality/Title Suggestion Index
+Sorted-array prefix index behind /api/parking/suggest typeahead
+"""
+import bisect
+import heapq
+import threading
+from utils.locality import normalize_locality
+from utils.geo_index import GeoIndex
+
+# Fields needed to derive a listing's suggestion terms
+SUGGEST_PROJECTION = {
+    'title': 1,
+    'address': 1,
+    'city': 1,
+    'status': 1,
+    'is_available': 1,
+    'location': 1
+}
+
+
+def listing_terms(parking):
+    """{normalized term: (label, kind)} for one listing
+
+    Every comma-separated part of the address (and the city) is a locality,
+    and the title is offered as-is.
+    """
+    terms = {}
+    parts = str(parking.get('address') or '').split(',')
+    if parking.get('city'):
+        parts.append(str(parking['city']))
+    for part in parts:
+        label = ' '.join(part.split())
+        key = normalize_locality(label)
+        if len(key) > 1 and key not in terms:
+            terms[key] = (label, 'locality')
+    title = ' '.join(str(parking.get('title') or '').split())
+    key = normalize_locality(title)
+    if len(key) > 1 and key not in terms:
+        terms[key] = (title, 'title')
+    return terms
+
+
+class SuggestIndex:
+    """Sorted array of normalized terms with per-term listing counts
+
+    A prefix lookup is one bisect to the first term >= prefix and a forward
+    walk while terms still start with it. Each listing remembers the terms
+    it contributed so updates only touch those terms.
+    """
+
+    def __init__(self):
+        self.ready = False
+        self._lock = threading.Lock()
+        self._keys = []
+        self._terms = {}
+        self._by_listing = {}
+
+    def build(self, db):
+        """Load terms for all searchable listings"""
+        docs = db.find_many(
+            'parking_spaces',
+            {'status': 'approved', 'is_available': True},
+            projection=SUGGEST_PROJECTION
+        )
+        with self._lock:
+            self._keys = []
+            self._terms = {}
+            self._by_listing = {}
+            for parking in docs:
+                self._add_locked(str(parking['_id']), parking)
+            self._keys = sorted(self._terms)
+            self.ready = True
+        print(f"✅ Suggest index built with {len(self._keys)} terms")
+
+    def sync(self, parking_id, parking):
+        """Apply a listing's post-write state (None if it no longer exists)"""
+        if not self.ready:
+            return
+        parking_id = str(parking_id)
+        with self._lock:
+            self._remove_locked(parking_id)
+            if GeoIndex.is_eligible(parking):
+                for key in self._add_locked(parking_id, parking):
+                    bisect.insort(self._keys, key)
+
+    def _add_locked(self, parking_id, parking):
+        """Count a listing's terms; returns terms that are new to the index"""
+        added = []
+        terms = listing_terms(parking)
+        for key, (label, kind) in terms.items():
+            entry = self._terms.get(key)
+            if entry is None:
+                self._terms[key] = {'label': label, 'kind': kind, 'count': 1}
+                added.append(key)
+            else:
+                entry['count'] += 1
+        self._by_listing[parking_id] = list(terms)
+        return added
+
+    def _remove_locked(self, parking_id):
+        for key in self._by_listing.pop(parking_id, ()):
+            entry = self._terms.get(key)
+            if entry is None:
+                continue
+            entry['count'] -= 1
+            if entry['count'] <= 0:
+                del self._terms[key]
+                i = bisect.bisect_left(self._keys, key)
+                if i < len(self._keys) and self._keys[i] == key:
+                    del self._keys[i]
+
+    def suggest(self, query, limit=8):
+        """Top completions for a prefix, most listings first"""
+        prefix = normalize_locality(query)
+        if not prefix:
+            return []
+        with self._lock:
+            i = bisect.bisect_left(self._keys, prefix)
+            matches = []
+            while i < len(self._keys) and self._keys[i].startswith(prefix):
+                key = self._keys[i]
+                entry = self._terms[key]
+                matches.append((entry['count'], key, entry['label'], entry['kind']))
+                i += 1
+        top = heapq.nlargest(limit, matches, key=lambda m: (m[0], -len(m[1])))
+        return [
+            {'text': label, 'type': kind, 'listing_count': count}
+            for count, _, label, kind in top
+        ]
+
+    def stats(self):
+        with self._lock:
+            return {
+                'ready': self.ready,
+                'terms': len(self._keys),
+                'listings': len(self._by_listing)
+            }
+
+
+# Global suggest index instance
+suggest_index = SuggestIndex()
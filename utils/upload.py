@@ -0,0 +1,118 @@
+"""
+Streaming Image Upload Utility
+Reads uploads in fixed-size chunks: sniffs the type from magic bytes,
+hashes incrementally and enforces a size cap without buffering the file
+"""
+import hashlib
+import shutil
+import tempfile
+from werkzeug.formparser import parse_form_data
+
+READ_CHUNK = 64 * 1024
+
+# Spooled copies stay in memory up to this size, then move to disk
+SPOOL_MEMORY_BYTES = 1024 * 1024
+
+# Allowance for multipart boundaries and part headers around one image
+MULTIPART_OVERHEAD_BYTES = 64 * 1024
+
+# (prefix, content type); WebP is checked separately (RIFF....WEBP)
+MAGIC_NUMBERS = (
+    (b'\x89PNG\r\n\x1a\n', 'image/png'),
+    (b'\xff\xd8\xff', 'image/jpeg'),
+    (b'GIF87a', 'image/gif'),
+    (b'GIF89a', 'image/gif'),
+)
+
+
+class ImageTooLarge(ValueError):
+    """Upload exceeded the per-image size cap"""
+
+
+def sniff_image_type(head):
+    """Content type from an upload's first bytes, or None if not a supported image"""
+    for magic, content_type in MAGIC_NUMBERS:
+        if head.startswith(magic):
+            return content_type
+    if len(head) >= 12 and head[:4] == b'RIFF' and head[8:12] == b'WEBP':
+        return 'image/webp'
+    return None
+
+
+class ImageUpload:
+    """A validated upload: seekable file positioned at 0, plus its digest"""
+
+    def __init__(self, fileobj, sha256, length, content_type, owned):
+        self.file = fileobj
+        self.sha256 = sha256
+        self.length = length
+        self.content_type = content_type
+        self._owned = owned
+
+    def close(self):
+        if self._owned:
+            self.file.close()
+
+
+def upload_files(environ, max_bytes):
+    """Parse a multipart upload request capped at one image of max_bytes
+    
+    The app-wide MAX_CONTENT_LENGTH is sized for JSON bodies with embedded
+    images; this applies the tighter per-image cap before the body is
+    spooled. A larger Content-Length is refused without reading the body
+    and chunked bodies stop at the cap (werkzeug RequestEntityTooLarge).
+    """
+    _, _, files = parse_form_data(environ, max_content_length=max_bytes + MULTIPART_OVERHEAD_BYTES)
+    return files
+
+
+def receive_image(stream, max_bytes):
+    """Consume an upload stream chunk by chunk
+
+    Werkzeug already spools multipart files to a seekable temporary file;
+    that is reused as-is. Any other stream is copied into a spooled
+    temporary file while it is read. Raises ValueError for non-images and
+    ImageTooLarge as soon as max_bytes is passed.
+    """
+    owned = not (hasattr(stream, 'seekable') and stream.seekable())
+    target = tempfile.SpooledTemporaryFile(max_size=SPOOL_MEMORY_BYTES) if owned else None
+    digest = hashlib.sha256()
+    length = 0
+    content_type = None
+    try:
+        if not owned:
+            stream.seek(0)
+        while True:
+            chunk = stream.read(READ_CHUNK)
+            if not chunk:
+                break
+            if content_type is None:
+                content_type = sniff_image_type(chunk)
+                if content_type is None:
+                    raise ValueError("File is not a PNG, JPEG, GIF or WebP image")
+            length += len(chunk)
+            if length > max_bytes:
+                raise ImageTooLarge(f"Image exceeds the {max_bytes // (1024 * 1024)}MB limit")
+            digest.update(chunk)
+            if owned:
+                target.write(chunk)
+        if content_type is None:
+            raise ValueError("Uploaded file is empty")
+    except Exception:
+        if target is not None:
+            target.close()
+        raise
+
+    fileobj = target if owned else stream
+    fileobj.seek(0)
+    return ImageUpload(fileobj, digest.hexdigest(), length, content_type, owned)
+
+
+def copy_to_tempfile(fileobj, suffix=''):
+    """Copy a file object to a named temp file on disk and return its path"""
+    fileobj.seek(0)
+    with tempfile.NamedTemporaryFile(suffix=suffix, delete=False) as out:
+        shutil.copyfileobj(fileobj, out, READ_CHUNK)
+        path = out.name
+    fileobj.seek(0)
+    return path